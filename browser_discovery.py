@@ -0,0 +1,251 @@
+import os
+import re
+import sys
+import json
+import shutil
+import platform
+import subprocess
+import threading
+
+DEFAULT_DISCOVERY_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "playwright_chrome_manager",
+                                            "browser_path.json")
+
+# Priority order. Each browser has its standard install paths per platform and the command names
+# shutil.which() should look for on PATH.
+BROWSERS = ("brave", "comet", "edge", "chrome", "chromium")
+
+COMMAND_NAMES = {
+    "brave": ("brave-browser", "brave"),
+    "comet": ("comet-browser", "comet"),
+    "edge": ("microsoft-edge", "microsoft-edge-stable", "msedge"),
+    "chrome": ("google-chrome", "google-chrome-stable", "chrome"),
+    "chromium": ("chromium", "chromium-browser"),
+}
+
+_HOME = os.path.expanduser("~")
+
+KNOWN_PATHS = {
+    "Darwin": {
+        "brave": ["/Applications/Brave Browser.app/Contents/MacOS/Brave Browser",
+                  os.path.join(_HOME, "Applications/Brave Browser.app/Contents/MacOS/Brave Browser")],
+        "comet": ["/Applications/Comet Browser.app/Contents/MacOS/Comet Browser",
+                  os.path.join(_HOME, "Applications/Comet Browser.app/Contents/MacOS/Comet Browser")],
+        "edge": ["/Applications/Microsoft Edge.app/Contents/MacOS/Microsoft Edge",
+                 os.path.join(_HOME, "Applications/Microsoft Edge.app/Contents/MacOS/Microsoft Edge")],
+        "chrome": ["/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
+                   os.path.join(_HOME, "Applications/Google Chrome.app/Contents/MacOS/Google Chrome")],
+        "chromium": ["/Applications/Chromium.app/Contents/MacOS/Chromium",
+                     os.path.join(_HOME, "Applications/Chromium.app/Contents/MacOS/Chromium")],
+    },
+    "Windows": {
+        "brave": [r"C:\Program Files\BraveSoftware\Brave-Browser\Application\brave.exe",
+                  r"C:\Program Files (x86)\BraveSoftware\Brave-Browser\Application\brave.exe",
+                  os.path.join(_HOME, r"AppData\Local\BraveSoftware\Brave-Browser\Application\brave.exe")],
+        "comet": [r"C:\Program Files\CometBrowser\Application\comet.exe",
+                  r"C:\Program Files (x86)\CometBrowser\Application\comet.exe",
+                  os.path.join(_HOME, r"AppData\Local\CometBrowser\Application\comet.exe")],
+        "edge": [r"C:\Program Files\Microsoft\Edge\Application\msedge.exe",
+                 r"C:\Program Files (x86)\Microsoft\Edge\Application\msedge.exe",
+                 os.path.join(_HOME, r"AppData\Local\Microsoft\Edge\Application\msedge.exe")],
+        "chrome": [r"C:\Program Files\Google\Chrome\Application\chrome.exe",
+                   r"C:\Program Files (x86)\Google\Chrome\Application\chrome.exe",
+                   os.path.join(_HOME, r"AppData\Local\Google\Chrome\Application\chrome.exe"),
+                   r"C:\Program Files\Google\Chrome Beta\Application\chrome.exe",
+                   r"C:\Program Files\Google\Chrome Canary\Application\chrome.exe"],
+        "chromium": [r"C:\Program Files\Chromium\Application\chromium.exe",
+                     r"C:\Program Files (x86)\Chromium\Application\chromium.exe",
+                     os.path.join(_HOME, r"AppData\Local\Chromium\Application\chromium.exe")],
+    },
+    "Linux": {
+        "brave": ["/usr/bin/brave-browser", "/usr/bin/brave", "/usr/local/bin/brave-browser",
+                  "/usr/local/bin/brave", os.path.join(_HOME, ".local/bin/brave-browser")],
+        "comet": ["/usr/bin/comet-browser", "/usr/bin/comet", "/usr/local/bin/comet-browser",
+                  "/usr/local/bin/comet", os.path.join(_HOME, ".local/bin/comet-browser")],
+        "edge": ["/usr/bin/microsoft-edge", "/usr/bin/microsoft-edge-stable", "/usr/local/bin/microsoft-edge"],
+        "chrome": ["/usr/bin/google-chrome", "/usr/bin/google-chrome-stable", "/usr/local/bin/google-chrome"],
+        "chromium": ["/usr/bin/chromium", "/usr/bin/chromium-browser", "/usr/local/bin/chromium",
+                     os.path.join(_HOME, ".local/bin/chromium")],
+    },
+}
+
+_VERSION_RE = re.compile(r"(\d+(?:\.\d+){1,3})")
+_memo = {}
+_memo_lock = threading.Lock()
+
+
+class BrowserNotFoundError(FileNotFoundError):
+    """No browser matched and discovery was not allowed to prompt for one."""
+
+
+def browser_version(path):
+    """
+    Version string of a Chromium-based browser, e.g. "120.0.6099.109", or None if unknown.
+    Windows installs keep the version as a directory next to the executable; elsewhere
+    the executable is asked with --version.
+    """
+    if platform.system() == "Windows":
+        folder = os.path.dirname(path)
+        versions = [d for d in os.listdir(folder) if _VERSION_RE.fullmatch(d)] if os.path.isdir(folder) else []
+        return max(versions, key=lambda v: tuple(int(x) for x in v.split(".")), default=None)
+    try:
+        out = subprocess.run([path, "--version"], capture_output=True, text=True, timeout=10).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None
+    match = _VERSION_RE.search(out)
+    return match.group(1) if match else None
+
+
+def _version_matches(found, wanted):
+    """True if found starts with the dotted components of wanted ("120" matches "120.0.6099.109")."""
+    if not wanted:
+        return True
+    return found is not None and found.split(".")[:len(wanted.split("."))] == wanted.split(".")
+
+
+def _candidates(browsers, system):
+    """Yield (browser, path) for every install location and PATH entry, in priority order."""
+    known = KNOWN_PATHS.get(system, {})
+    for name in browsers:
+        for path in known.get(name, ()):
+            yield name, path
+        for command in COMMAND_NAMES[name]:
+            found = shutil.which(command)
+            if found:
+                yield name, found
+
+
+def _normalize_browsers(browser):
+    if browser is None:
+        return BROWSERS
+    names = (browser,) if isinstance(browser, str) else tuple(browser)
+    unknown = [n for n in names if n not in BROWSERS]
+    if unknown:
+        raise ValueError(f"Unknown browser {unknown[0]!r}: choose from {', '.join(BROWSERS)}.")
+    return names
+
+
+def _load_cache(cache_path):
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_cache(cache_path, cache):
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        tmp = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(cache, f, indent=1)
+        os.replace(tmp, cache_path)
+    except OSError as e:
+        print(f"Could not save browser discovery cache: {e}")
+
+
+def _cached_path(entry, version):
+    """Return the cached path if the executable is unchanged (same mtime) since it was cached."""
+    try:
+        if os.stat(entry["path"]).st_mtime != entry["mtime"]:
+            return None
+    except (OSError, KeyError, TypeError):
+        return None
+    if version and not _version_matches(entry.get("version"), version):
+        return None
+    return entry["path"]
+
+
+def find_browser(browser=None, version=None, interactive=None, cache_path=DEFAULT_DISCOVERY_CACHE_PATH,
+                 refresh=False):
+    """
+    Locate a Chromium-based browser executable.
+    Order: the BROWSER_PATH environment variable, the in-process and on-disk cache (invalidated when
+    the executable's mtime changes), then standard install paths and PATH (shutil.which) in priority
+    order Brave, Comet, Edge, Chrome, Chromium.
+    :param browser: Only consider this browser ("chrome", "edge", ...) or a list of them, in order.
+    :param version: Only accept this version or version prefix, e.g. "120" or "120.0.6099".
+    :param interactive: Ask on stdin when nothing is found. Default: only if stdin is a terminal;
+                        otherwise BrowserNotFoundError is raised.
+    :param cache_path: JSON cache file (None disables the disk cache).
+    :param refresh: Ignore cached results and scan again.
+    """
+    env_path = os.environ.get("BROWSER_PATH")
+    if env_path:
+        if not os.path.exists(env_path):
+            raise BrowserNotFoundError(f"BROWSER_PATH points to a missing file: {env_path}")
+        return env_path
+
+    browsers = _normalize_browsers(browser)
+    system = platform.system()
+    key = f"{system}-{platform.machine()}|{','.join(browsers)}|{version or ''}"
+    if not refresh:
+        with _memo_lock:
+            entry = _memo.get(key)
+        path = entry and _cached_path(entry, version)
+        if path:
+            return path
+        if cache_path:
+            entry = _load_cache(cache_path).get(key)
+            path = entry and _cached_path(entry, version)
+            if path:
+                with _memo_lock:
+                    _memo[key] = entry
+                return path
+
+    for name, path in _candidates(browsers, system):
+        if not os.path.exists(path):
+            continue
+        found_version = browser_version(path) if version else None
+        if not _version_matches(found_version, version):
+            print(f"  Skipping {path} (version {found_version or 'unknown'}, want {version})", flush=True)
+            continue
+        print(f"Using {name} browser: {path}", flush=True)
+        entry = {"path": path, "mtime": os.stat(path).st_mtime, "browser": name, "version": found_version}
+        with _memo_lock:
+            _memo[key] = entry
+        if cache_path:
+            cache = _load_cache(cache_path)
+            cache[key] = entry
+            _save_cache(cache_path, cache)
+        return path
+
+    wanted = f"{'/'.join(browsers)}{f' {version}' if version else ''}"
+    if interactive is None:
+        interactive = sys.stdin is not None and sys.stdin.isatty()
+    if not interactive:
+        raise BrowserNotFoundError(
+            f"No supported browser ({wanted}) found. Install one, pass browser_path=..., or set BROWSER_PATH.")
+    return prompt_for_browser()
+
+
+def prompt_for_browser():
+    """Ask for the browser executable on stdin until a plausible path is given (exits on cancel)."""
+    print("\nNo supported browser found in standard locations.", flush=True)
+    print("Please paste the **full path** to the executable (e.g. brave.exe, comet.exe, chrome.exe.exe, chrome.exe).", flush=True)
+    print("Tip: right-click the browser shortcut → Properties → copy the 'Target' field.\n", flush=True)
+
+    while True:
+        try:
+            user_path = input("BROWSER PATH: ").strip().strip('"\'')
+        except (EOFError, KeyboardInterrupt):
+            print("\nCancelled by user.", flush=True)
+            sys.exit(1)
+
+        if not user_path:
+            print("Empty input – try again.", flush=True)
+            continue
+
+        if os.path.exists(user_path):
+            name = os.path.basename(user_path).lower()
+            if any(exe in name for exe in ("brave", "comet", "msedge", "chrome", "chromium")):
+                print(f"\nACCEPTED: {user_path}\n", flush=True)
+                return user_path
+            else:
+                print("File name does not look like a supported browser.", flush=True)
+        else:
+            print(f"File not found: {user_path}", flush=True)
+
+        retry = input("Try another path? (y/n): ").strip().lower()
+        if retry not in ("y", "yes"):
+            print("No path provided – exiting.", flush=True)
+            sys.exit(1)
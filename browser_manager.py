@@ -1,232 +1,520 @@
 import os
+import json
+import uuid
+import asyncio
 import subprocess
 import time
-import platform
 import socket
+import urllib.request
+from contextlib import contextmanager
 import psutil
-from playwright.async_api import async_playwright
-from playwright.sync_api import sync_playwright
-from proxy_config import detect_country, country_from_dataimpulse_username, FINGERPRINTS, DEFAULT_FINGERPRINT
+from playwright_runtime import (
+    acquire_sync_playwright, release_sync_playwright, acquire_async_playwright, release_async_playwright,
+)
+from process_registry import register_browser, unregister_browser, sweep_orphans, profile_in_use
+from profile_tools import (
+    snapshot_profile, snapshot_path, clone_snapshot, default_base_profile_dir, dir_size, profile_size_report,
+    compact_profile_dir, clone_dir, make_ephemeral_dir, ephemeral_path, remove_ephemeral_dir,
+)
+from resource_blocking import resolve_block_spec, make_route_handler, make_async_route_handler
+from session_state import save_state, load_state, origins_of
+from leak_check import LeakTracker
+from browser_discovery import find_browser
+from launch_options import build_launch_args
+from browser_output import BrowserOutput
+from proxy_config import (
+    proxy_country, proxy_country_async, fingerprint_context_args, ProxyRotator, FINGERPRINTS, DEFAULT_FINGERPRINT,
+)
+
+# Local DevTools probes must never be routed through an HTTP(S)_PROXY from the environment.
+_LOCAL_OPENER = urllib.request.build_opener(urllib.request.ProxyHandler({}))
+
+_ANTI_DETECTION_SCRIPT = """
+    () => {
+        Object.defineProperty(navigator, 'webdriver', { get: () => false });
+        Object.defineProperty(navigator, 'languages', { get: () => ['en-US', 'en'] });
+        Object.defineProperty(navigator, 'plugins', { get: () => [1,2,3,4,5] });
+        Object.defineProperty(navigator, 'hardwareConcurrency', { get: () => 8 });
+        window.chrome = window.chrome || {};
+        delete navigator.__proto__.webdriver;
+    }
+"""
 
 class BrowserManager:
-    def __init__(self, base_profile_dir=None, browser_path=None, debug_port=9222):
+    def __init__(self, base_profile_dir=None, browser_path=None, debug_port=9222, startup_timeout=30,
+                 keep_warm=False, warm_ttl=300, shared_playwright=True, reap_orphans=False, shutdown_timeout=5,
+                 metrics=None, compact_policy=None, leak_check=None, browser_name=None, browser_version=None,
+                 interactive=None, launch_preset=None, launch_args=None, browser_output="buffer", log_lines=1000):
         """
         Initialize the BrowserManager.
         :param base_profile_dir: Base directory for profile folders (default: ~/ChromeProfiles or C:\ChromeProfiles).
-        :param browser_path: Path to browser executable (auto-detected if None).
+        :param browser_path: Path to browser executable (auto-detected if None, or taken from BROWSER_PATH).
         :param debug_port: Port for remote debugging (default: 9222).
+        :param startup_timeout: Seconds to wait for the DevTools endpoint after launch (default: 30).
+        :param keep_warm: If True, close_browser only closes pages and keeps the browser idle for reuse.
+        :param warm_ttl: Seconds an idle warm browser is kept before it is evicted (default: 300).
+        :param shared_playwright: Use one reference-counted Playwright driver per thread/event loop
+                                  instead of starting a driver per manager (default: True).
+        :param reap_orphans: On startup, kill browsers left running under base_profile_dir by a crashed run.
+        :param shutdown_timeout: Seconds to wait at each shutdown step (CDP close, terminate) before escalating.
+        :param metrics: A metrics.MetricsSink that receives the duration of every lifecycle phase.
+        :param compact_policy: Trim caches before each launch: "always", or a dict such as
+                               {"max_size_mb": 500, "include_history": False} to trim only oversized profiles.
+        :param leak_check: Debug mode that tracks the drivers, contexts and pages this manager opens and,
+                           at close, prints ("warn") or raises ResourceLeakError ("raise") for any left open.
+        :param browser_name: Pin auto-detection to one browser ("brave", "comet", "edge", "chrome", "chromium").
+        :param browser_version: Pin auto-detection to a version or prefix, e.g. "120".
+        :param interactive: Ask for the browser path on stdin if none is found (default: only when stdin
+                            is a terminal); otherwise browser_discovery.BrowserNotFoundError is raised.
+        :param launch_preset: Named set of browser flags from launch_options.LAUNCH_PRESETS, e.g. "low-memory"
+                              (or a list of names).
+        :param launch_args: Extra browser flags for every launch: ["--flag=value", ...] or {"--flag": value}
+                            (None removes a flag set by the preset). Connect methods take per-call launch_args too.
+        :param browser_output: Where the browser's stdout/stderr go: "buffer" (drained into a ring buffer
+                               read by browser_logs()), "devnull", "inherit" (this console) or a log file path.
+        :param log_lines: Output lines kept by browser_logs() (default: 1000).
         """
         if base_profile_dir is None:
-            base_profile_dir = "C:\\ChromeProfiles" if platform.system() != "Darwin" else os.path.expanduser("~/ChromeProfiles")
+            base_profile_dir = default_base_profile_dir()
         self.base_profile_dir = base_profile_dir
         os.makedirs(self.base_profile_dir, exist_ok=True)
-        self.browser_path = browser_path or self._find_browser_path()
+        self.browser_path = browser_path or self._find_browser_path(browser_name, browser_version, interactive)
         self.debug_port = debug_port
+        self.startup_timeout = startup_timeout
+        self.shutdown_timeout = shutdown_timeout
+        self.last_shutdown = None
+        self.metrics = metrics
+        self.compact_policy = compact_policy
+        self.launch_preset = launch_preset
+        self.launch_args = launch_args
+        build_launch_args(self.browser_path, "", preset=launch_preset, extra_args=(launch_args,))  # validate early
+        self._output = BrowserOutput(browser_output, log_lines)
         self.browser_process = None
         self.playwright_instance = None
         self.browser = None
+        self.context = None
         self.page = None
         self.process_pid = None
+        self.shared_playwright = shared_playwright
+        self.keep_warm = keep_warm
+        self.warm_ttl = warm_ttl
+        self.profile_name = None
+        self._warm_anchor = None
+        self._warm_async = False
+        self._idle_since = None
+        self._route_handler = None
+        self._extra_contexts = []  # contexts opened by connect_with_session / add_proxy_context
+        self.proxy_contexts = {}  # name -> context opened by add_proxy_context
+        self._host_lock = None
+        self._leaks = LeakTracker(f"BrowserManager(port {debug_port})", leak_check) if leak_check else None
+        self.last_leaks = []
+        if reap_orphans:
+            self.sweep_orphans()
 
-    def _find_browser_path(self):
-        """
-        Find browser executable with priority:
-            1. Brave
-            2. Comet
-            3. Edge
-            4. Chrome
-            5. Chromium
-        Returns the first existing path or prompts the user.
-        """
-        import sys
-        system = platform.system()
-        possible_paths = []
-
-        # --------------------------------------------------------------------- macOS
-        if system == "Darwin":
-            possible_paths = [
-                # 1. Brave
-                "/Applications/Brave Browser.app/Contents/MacOS/Brave Browser",
-                os.path.expanduser("~/Applications/Brave Browser.app/Contents/MacOS/Brave Browser"),
-                # 2. Comet
-                "/Applications/Comet Browser.app/Contents/MacOS/Comet Browser",
-                os.path.expanduser("~/Applications/Comet Browser.app/Contents/MacOS/Comet Browser"),
-                # 3. Edge
-                "/Applications/Microsoft Edge.app/Contents/MacOS/Microsoft Edge",
-                os.path.expanduser("~/Applications/Applications/Microsoft Edge.app/Contents/MacOS/Microsoft Edge"),
-                # 4. Chrome
-                "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
-                os.path.expanduser("~/Applications/Google Chrome.app/Contents/MacOS/Google Chrome"),
-                # 5. Chromium
-                "/Applications/Chromium.app/Contents/MacOS/Chromium",
-                os.path.expanduser("~/Applications/Chromium.app/Contents/MacOS/Chromium"),
-            ]
-
-        # --------------------------------------------------------------------- Windows
-        elif system == "Windows":
-            possible_paths = [
-                # 1. Brave
-                r"C:\Program Files\BraveSoftware\Brave-Browser\Application\brave.exe",
-                r"C:\Program Files (x86)\BraveSoftware\Brave-Browser\Application\brave.exe",
-                os.path.expanduser(r"~\AppData\Local\BraveSoftware\Brave-Browser\Application\brave.exe"),
-                # 2. Comet
-                r"C:\Program Files\CometBrowser\Application\comet.exe",
-                r"C:\Program Files (x86)\CometBrowser\Application\comet.exe",
-                os.path.expanduser(r"~\AppData\Local\CometBrowser\Application\comet.exe"),
-                # 3. Edge
-                r"C:\Program Files\Microsoft\Edge\Application\msedge.exe",
-                r"C:\Program Files (x86)\Microsoft\Edge\Application\msedge.exe",
-                os.path.expanduser(r"~\AppData\Local\Microsoft\Edge\Application\msedge.exe"),
-                # 4. Chrome (stable + beta + canary)
-                r"C:\Program Files\Google\Chrome\Application\chrome.exe",
-                r"C:\Program Files (x86)\Google\Chrome\Application\chrome.exe",
-                os.path.expanduser(r"~\AppData\Local\Google\Chrome\Application\chrome.exe"),
-                r"C:\Program Files\Google\Chrome Beta\Application\chrome.exe",
-                r"C:\Program Files\Google\Chrome Canary\Application\chrome.exe",
-                # 5. Chromium
-                r"C:\Program Files\Chromium\Application\chromium.exe",
-                r"C:\Program Files (x86)\Chromium\Application\chromium.exe",
-                os.path.expanduser(r"~\AppData\Local\Chromium\Application\chromium.exe"),
-            ]
-
-        # --------------------------------------------------------------------- Linux
-        elif system == "Linux":
-            possible_paths = [
-                # 1. Brave
-                "/usr/bin/brave-browser",
-                "/usr/bin/brave",
-                "/usr/local/bin/brave-browser",
-                "/usr/local/bin/brave",
-                os.path.expanduser("~/.local/bin/brave-browser"),
-                # 2. Comet
-                "/usr/bin/comet-browser",
-                "/usr/bin/comet",
-                "/usr/local/bin/comet-browser",
-                "/usr/local/bin/comet",
-                os.path.expanduser("~/.local/bin/comet-browser"),
-                # 3. Edge
-                "/usr/bin/microsoft-edge",
-                "/usr/bin/microsoft-edge-stable",
-                "/usr/local/bin/microsoft-edge",
-                # 4. Chrome
-                "/usr/bin/google-chrome",
-                "/usr/bin/google-chrome-stable",
-                "/usr/local/bin/google-chrome",
-                # 5. Chromium
-                "/usr/bin/chromium",
-                "/usr/bin/chromium-browser",
-                "/usr/local/bin/chromium",
-                os.path.expanduser("~/.local/bin/chromium"),
-            ]
-
-        # --------------------------------------------------------------------- Scan
-        print("\nScanning for browser executable (priority order)...", flush=True)
-        for p in possible_paths:
-            exists = os.path.exists(p)
-            print(f"  {'Found' if exists else 'Not found'} {p}", flush=True)
-            if exists:
-                print(f"\nSELECTED: {p}\n", flush=True)
-                return p
-
-        # --------------------------------------------------------------------- Prompt user
-        print("\nNo supported browser found in standard locations.", flush=True)
-        print("Please paste the **full path** to the executable (e.g. brave.exe, comet.exe, chrome.exe.exe, chrome.exe).", flush=True)
-        print("Tip: right-click the browser shortcut → Properties → copy the 'Target' field.\n", flush=True)
-
-        while True:
-            try:
-                user_path = input("BROWSER PATH: ").strip().strip('"\'')
-            except (EOFError, KeyboardInterrupt):
-                print("\nCancelled by user.", flush=True)
-                user_path = None
-                sys.exit(1)
-
-            if not user_path:
-                print("Empty input – try again.", flush=True)
-                continue
-
-            if os.path.exists(user_path):
-                name = os.path.basename(user_path).lower()
-                if any(exe in name for exe in ("brave", "comet", "msedge", "chrome", "chromium")):
-                    print(f"\nACCEPTED: {user_path}\n", flush=True)
-                    return user_path
-                else:
-                    print("File name does not look like a supported browser.", flush=True)
-            else:
-                print(f"File not found: {user_path}", flush=True)
-
-            retry = input("Try another path? (y/n): ").strip().lower()
-            if retry not in ("y", "yes"):
-                print("No path provided – exiting.", flush=True)
-                sys.exit(1)
+    def _find_browser_path(self, browser_name=None, browser_version=None, interactive=None):
+        """
+        Find the browser executable (see browser_discovery.find_browser): BROWSER_PATH, the cached
+        result of an earlier scan, then install paths and PATH in the order Brave, Comet, Edge, Chrome, Chromium.
+        """
+        return find_browser(browser_name, browser_version, interactive)
 
     def _is_port_open(self, port):
         """Check if the specified port is available."""
         with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
             return s.connect_ex(('127.0.0.1', port)) != 0
 
-    def _kill_child_processes(self, pid):
-        """Kill all child processes of the given PID."""
+    @contextmanager
+    def _timed(self, phase, profile_name=None):
+        """Time a lifecycle phase (see metrics.PHASES) and report it to the metrics sink."""
+        if self.metrics is None:
+            yield
+            return
+        profile_name = profile_name or self.profile_name or ""
+        start = time.perf_counter()
+        status = "error"
+        try:
+            yield
+            status = "ok"
+        finally:
+            labels = {"profile": profile_name, "status": status}
+            try:
+                self.metrics.observe(phase, time.perf_counter() - start, labels)
+            except Exception as e:
+                print(f"Metrics sink error: {e}")
+
+    async def _probe_cdp_async(self, port):
+        """Async version of _probe_cdp over a raw asyncio connection, so probing needs no threads."""
+        writer = None
+        try:
+            reader, writer = await asyncio.wait_for(asyncio.open_connection("127.0.0.1", port), timeout=1)
+            writer.write(f"GET /json/version HTTP/1.1\r\nHost: 127.0.0.1:{port}\r\nConnection: close\r\n\r\n"
+                         .encode("ascii"))
+            return await asyncio.wait_for(self._read_cdp_response(reader), timeout=1)
+        except (OSError, ValueError, EOFError, asyncio.TimeoutError, asyncio.LimitOverrunError):
+            return None
+        finally:
+            if writer is not None:
+                writer.close()
+
+    @staticmethod
+    async def _read_cdp_response(reader):
+        """Read one HTTP response by its Content-Length, so a kept-alive connection does not stall it."""
+        head = await reader.readuntil(b"\r\n\r\n")
+        lines = head.decode("latin-1").split("\r\n")
+        if " 200 " not in lines[0] + " ":
+            return None
+        length = None
+        for line in lines[1:]:
+            name, _, value = line.partition(":")
+            if name.strip().lower() == "content-length":
+                length = int(value.strip())
+        body = await (reader.read() if length is None else reader.readexactly(length))
+        return json.loads(body.decode("utf-8"))
+
+    def _probe_cdp(self, port):
+        """Return the /json/version payload if DevTools answers on the port, else None."""
+        try:
+            with _LOCAL_OPENER.open(f"http://127.0.0.1:{port}/json/version", timeout=1) as resp:
+                return json.loads(resp.read().decode("utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def _spawn(self, args):
+        """Start the browser process with its output routed according to browser_output."""
+        try:
+            process = subprocess.Popen(args, shell=False, **self._output.popen_kwargs())
+        finally:
+            self._output.release()
+        self._output.attach(process)
+        return process
+
+    async def _spawn_async(self, args):
+        """Async version of _spawn using asyncio.create_subprocess_exec."""
+        try:
+            process = await asyncio.create_subprocess_exec(*args, **self._output.popen_kwargs())
+        finally:
+            self._output.release()
+        self._output.attach(process)
+        return process
+
+    def _process_exit_code(self):
+        """Exit code of the launched browser, or None while it runs (Popen and asyncio processes alike)."""
+        process = self.browser_process
+        if process is None:
+            return None
+        return process.poll() if hasattr(process, "poll") else process.returncode
+
+    def browser_logs(self, last=None):
+        """
+        Recent stdout/stderr lines of the launched browser (kept after it exits, until the next launch).
+        Empty in "devnull" and "inherit" modes; read from the end of the file for a log file path.
+        """
+        return self._output.lines(last)
+
+    def _format_logs(self, last=20):
+        lines = self.browser_logs(last)
+        return "\n  Last browser output:\n    " + "\n    ".join(lines) if lines else ""
+
+    def _check_launch_alive(self):
+        """Raise if the launched browser process has already exited."""
+        if self._process_exit_code() is not None:
+            self._output.detach()
+            raise RuntimeError(
+                f"Browser exited with code {self._process_exit_code()} before DevTools became ready."
+                f"{self._format_logs()}"
+            )
+
+    def _wait_for_cdp(self, port=None, timeout=None):
+        """
+        Poll the DevTools endpoint until it answers, with exponential backoff.
+        :param port: Debug port to probe (default: self.debug_port).
+        :param timeout: Deadline in seconds (default: self.startup_timeout).
+        :return: The /json/version payload.
+        """
+        port = port or self.debug_port
+        timeout = self.startup_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        delay = 0.05
+        while True:
+            info = self._probe_cdp(port)
+            if info:
+                return info
+            self._check_launch_alive()
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"DevTools on port {port} not ready after {timeout}s.")
+            time.sleep(min(delay, remaining))
+            delay = min(delay * 2, 0.5)
+
+    async def _wait_for_cdp_async(self, port=None, timeout=None):
+        """Non-blocking version of _wait_for_cdp for use on an event loop."""
+        port = port or self.debug_port
+        timeout = self.startup_timeout if timeout is None else timeout
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        delay = 0.05
+        while True:
+            info = await self._probe_cdp_async(port)
+            if info:
+                return info
+            if self._process_exit_code() is not None:
+                await self._output.detach_async()
+            self._check_launch_alive()
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                raise TimeoutError(f"DevTools on port {port} not ready after {timeout}s.")
+            await asyncio.sleep(min(delay, remaining))
+            delay = min(delay * 2, 0.5)
+
+    def _start_playwright(self):
+        """Start (or join the shared) sync Playwright driver."""
+        if self.shared_playwright:
+            playwright = acquire_sync_playwright()
+        else:
+            from playwright.sync_api import sync_playwright
+            playwright = sync_playwright().start()
+        self._track("driver", playwright)
+        return playwright
+
+    def _stop_playwright(self, playwright):
+        """Stop (or release the shared) sync Playwright driver."""
+        if self._leaks:
+            self._leaks.closed(playwright)
+        if self.shared_playwright:
+            release_sync_playwright(playwright)
+        else:
+            playwright.stop()
+
+    async def _start_playwright_async(self):
+        """Start (or join the shared) async Playwright driver."""
+        if self.shared_playwright:
+            playwright = await acquire_async_playwright()
+        else:
+            from playwright.async_api import async_playwright
+            playwright = await async_playwright().start()
+        self._track("driver", playwright)
+        return playwright
+
+    async def _stop_playwright_async(self, playwright):
+        """Stop (or release the shared) async Playwright driver."""
+        if self._leaks:
+            self._leaks.closed(playwright)
+        if self.shared_playwright:
+            await release_async_playwright(playwright)
+        else:
+            await playwright.stop()
+
+    def _terminate_process_tree(self, pid, cdp_close_sent=False):
+        """
+        Stop pid and its children, escalating only as far as needed:
+        wait for exit after CDP Browser.close, then terminate() and wait, then kill() what is left.
+        :return: {"level": "cdp" | "terminate" | "kill" | "gone", "seconds": float}
+        """
+        start = time.monotonic()
         try:
             parent = psutil.Process(pid)
-            for child in parent.children(recursive=True):
+            procs = parent.children(recursive=True) + [parent]
+        except psutil.NoSuchProcess:
+            level = "cdp" if cdp_close_sent else "gone"
+            return {"level": level, "seconds": 0.0}
+        level = "cdp"
+        alive = procs
+        if cdp_close_sent:
+            _, alive = psutil.wait_procs(procs, timeout=self.shutdown_timeout)
+        if alive:
+            level = "terminate"
+            for proc in alive:
                 try:
-                    child.kill()
-                    print(f"Killed child process: {child.pid}")
+                    proc.terminate()
                 except psutil.NoSuchProcess:
                     pass
-            parent.kill()
-            print(f"Killed parent process: {pid}")
-        except psutil.NoSuchProcess:
-            print(f"Process {pid} no longer exists")
+            _, alive = psutil.wait_procs(alive, timeout=self.shutdown_timeout)
+        if alive:
+            level = "kill"
+            for proc in alive:
+                try:
+                    proc.kill()
+                    print(f"Killed process: {proc.pid}")
+                except psutil.NoSuchProcess:
+                    pass
+            psutil.wait_procs(alive, timeout=3)
+        seconds = time.monotonic() - start
+        print(f"Browser process {pid} stopped via {level} in {seconds:.2f}s")
+        return {"level": level, "seconds": seconds}
+
+    def _send_browser_close(self):
+        """Ask Chromium to exit cleanly over CDP so profile databases are flushed. Returns True if sent."""
+        try:
+            session = self.browser.new_browser_cdp_session()
+        except Exception as e:
+            print(f"Could not open CDP session for Browser.close: {e}")
+            return False
+        try:
+            session.send("Browser.close")
+        except Exception:
+            pass  # the connection drops as the browser exits
+        return True
+
+    async def _send_browser_close_async(self):
+        """Async version of _send_browser_close."""
+        try:
+            session = await self.browser.new_browser_cdp_session()
         except Exception as e:
-            print(f"Error killing processes: {e}")
+            print(f"Could not open CDP session for Browser.close: {e}")
+            return False
+        try:
+            await session.send("Browser.close")
+        except Exception:
+            pass
+        return True
+
+    def sweep_orphans(self):
+        """
+        Kill browsers this registry launched under base_profile_dir whose launching process is gone, and
+        delete throwaway profiles such crashed processes left in .clones (see process_registry.sweep_orphans).
+        Returns the killed PIDs.
+        """
+        killed = sweep_orphans(self.base_profile_dir)
+        if killed:
+            print(f"Reaped {len(killed)} orphaned browser process(es).")
+        return killed
+
+    def _register_launch(self, profile_name):
+        """Record the launched browser so it is reaped if this process dies before close_browser."""
+        register_browser(self.base_profile_dir, profile_name, self.process_pid, self.debug_port,
+                         user_data_dir=self.get_profile_path(profile_name))
 
     def get_profile_path(self, profile_name):
         """Get the full path to the profile directory."""
-        return os.path.join(self.base_profile_dir, profile_name)
+        return self._ephemeral_path(profile_name) or os.path.join(self.base_profile_dir, profile_name)
+
+    def profile_size_report(self, profile_name):
+        """Per-directory size breakdown of a profile as [(relative path, bytes)], largest first."""
+        return profile_size_report(self.get_profile_path(profile_name))
+
+    def compact_profile(self, profile_name, include_history=False, dry_run=False):
+        """
+        Remove regenerable caches (Cache, Code Cache, GPUCache, Service Worker caches, ...) from a profile
+        while keeping cookies, Local Storage and login state.
+        :param include_history: Also remove browsing history databases.
+        :param dry_run: Only report what would be removed.
+        :return: {"removed": [(relative path, bytes)], "freed": bytes}
+        """
+        running = self.profile_name == profile_name and self.browser_process is not None
+        if running or (not dry_run and profile_in_use(self.get_profile_path(profile_name))):
+            raise RuntimeError(f"Profile '{profile_name}' is running. Close it before compacting.")
+        result = compact_profile_dir(self.get_profile_path(profile_name), include_history, dry_run)
+        verb = "Would free" if dry_run else "Freed"
+        print(f"🧹 {verb} {result['freed'] / 1024 / 1024:.1f} MB in profile '{profile_name}'")
+        return result
+
+    def _apply_compact_policy(self, profile_name):
+        """
+        Trim the profile before launch according to compact_policy. Skipped with a warning if another
+        browser (another manager, port or a manual launch) has the profile open.
+        """
+        policy = self.compact_policy
+        if not policy:
+            return
+        if policy == "always":
+            policy = {}
+        elif not isinstance(policy, dict):
+            raise ValueError(f"Unknown compact_policy {policy!r}: use 'always' or a dict.")
+        max_size_mb = policy.get("max_size_mb")
+        if max_size_mb is not None and dir_size(self.get_profile_path(profile_name)) < max_size_mb * 1024 * 1024:
+            return
+        if profile_in_use(self.get_profile_path(profile_name)):
+            print(f"⚠️ Profile '{profile_name}' is open in another browser; skipping compaction.")
+            return
+        self.compact_profile(profile_name, include_history=policy.get("include_history", False))
+
+    def snapshot_profile(self, profile_name, snapshot_name=None):
+        """
+        Save a read-only copy of a (logged-in) profile to clone from, without caches or lock files.
+        Close the profile's browser first so its cookie and storage databases are consistent.
+        :return: Path to the snapshot under <base_profile_dir>/.snapshots/.
+        """
+        if self.profile_name == profile_name and self.browser_process is not None:
+            raise RuntimeError(f"Profile '{profile_name}' is running. Close it before taking a snapshot.")
+        path = snapshot_profile(self.base_profile_dir, profile_name, snapshot_name)
+        print(f"📸 Snapshot of profile '{profile_name}' saved to {path}")
+        return path
+
+    def clone_profile(self, snapshot_name):
+        """
+        Create a throwaway profile from a snapshot (copy-on-write where the filesystem allows it) in
+        <base_profile_dir>/.clones. Pass the returned name to any connect method of any manager or
+        BrowserPool on the same base_profile_dir; the copy is deleted when its browser is closed,
+        and copies left behind by a crash are removed by sweep_orphans.
+        :return: Name of the ephemeral profile.
+        """
+        path, counts = clone_snapshot(snapshot_path(self.base_profile_dir, snapshot_name),
+                                      clone_dir(self.base_profile_dir))
+        name = os.path.basename(path)
+        print(f"Cloned snapshot '{snapshot_name}' → '{name}' "
+              f"(reflink {counts['reflink']}, hardlink {counts['hardlink']}, copy {counts['copy']})")
+        return name
+
+    def _ephemeral_path(self, profile_name):
+        """Directory of profile_name if it is a throwaway clone or session host, else None."""
+        return ephemeral_path(self.base_profile_dir, profile_name) if profile_name else None
+
+    def _discard_ephemeral(self, profile_name):
+        """Delete an ephemeral clone once its browser is gone."""
+        path = self._ephemeral_path(profile_name)
+        if path:
+            remove_ephemeral_dir(path)
+            print(f"Deleted ephemeral profile '{profile_name}'")
+
+    async def _discard_ephemeral_async(self, profile_name):
+        """Async version of _discard_ephemeral; the directory is deleted on an executor thread."""
+        path = self._ephemeral_path(profile_name)
+        if path:
+            await asyncio.get_running_loop().run_in_executor(None, remove_ephemeral_dir, path)
+            print(f"Deleted ephemeral profile '{profile_name}'")
 
     def profile_exists(self, profile_name):
         """Check if a profile exists."""
         return os.path.exists(self.get_profile_path(profile_name))
 
-    def setup_profile(self, profile_name, url=None, wait_message="Perform manual actions, then close the browser to save.", headless=False):
+    def _build_args(self, profile_name, headless, launch_args=None, url=None):
+        """Browser command line: base flags, the manager's preset and launch_args, then per-call launch_args."""
+        return build_launch_args(self.browser_path, self.get_profile_path(profile_name), self.debug_port, headless,
+                                 self.launch_preset, (self.launch_args, launch_args), url)
+
+    def setup_profile(self, profile_name, url=None, wait_message="Perform manual actions, then close the browser to save.", headless=False,
+                      launch_args=None):
         """Start browser for manual interaction to create or update a profile."""
-        user_data_dir = self.get_profile_path(profile_name)
         if not self._is_port_open(self.debug_port):
             raise RuntimeError(f"Port {self.debug_port} is in use. Choose another port.")
-        args = [
-            self.browser_path,
-            f"--remote-debugging-port={self.debug_port}",
-            f"--user-data-dir={user_data_dir}",
-            "--no-first-run",
-            "--no-default-browser-check"
-        ]
-        if url:
-            args.append(url)
-        if headless:
-            args.append("--headless=new")
+        args = self._build_args(profile_name, headless, launch_args, url)
         print(f"Starting browser for profile '{profile_name}'")
         print(wait_message)
         process = subprocess.Popen(args, shell=False)
+        register_browser(self.base_profile_dir, profile_name, process.pid, self.debug_port)
         process.wait()
+        unregister_browser(process.pid)
         self.close_browser()
         print(f"✅ Profile '{profile_name}' saved.")
 
-    def connect_to_browser(self, profile_name, url=None, headless=False, timeout=60000):
-        """Start browser with the specified profile and connect via Playwright."""
+    def connect_to_browser(self, profile_name, url=None, headless=False, timeout=60000, block_resources=None,
+                           launch_args=None):
+        """
+        Start browser with the specified profile and connect via Playwright.
+        :param block_resources: Abort matching requests: a preset ("scrape-text", "screenshot", "ads"),
+                                resource types, URL substrings or a list of these (see resource_blocking).
+        :param launch_args: Browser flags for this launch only, applied over the manager's preset and launch_args.
+        """
+        if self._idle_since is not None:
+            if self._can_reattach(profile_name, is_async=False):
+                return self._reattach_warm(url, timeout, block_resources)
+            self.close_browser(force=True)
         if not self.profile_exists(profile_name):
             raise ValueError(f"Profile '{profile_name}' does not exist. Create it first.")
         if not self._is_port_open(self.debug_port):
             raise RuntimeError(f"Port {self.debug_port} is in use. Choose another port.")
-        user_data_dir = self.get_profile_path(profile_name)
-        args = [
-            self.browser_path,
-            f"--remote-debugging-port={self.debug_port}",
-            f"--user-data-dir={user_data_dir}",
-            "--no-first-run",
-            "--no-default-browser-check"
-        ]
+        self._apply_compact_policy(profile_name)
+        args = self._build_args(profile_name, headless, launch_args)
         """
         example PowerShell command here:
             & "C:\Program Files\BraveSoftware\Brave-Browser\Application\brave.exe" `
@@ -236,139 +524,529 @@ class BrowserManager:
               --no-default-browser-check `
               "https://docs.python.org/3/library/subprocess.html"
         """
-        if headless:
-            args.append("--headless=new")
-        self.browser_process = subprocess.Popen(args, shell=False, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        with self._timed("spawn", profile_name):
+            self.browser_process = self._spawn(args)
         self.process_pid = self.browser_process.pid
-        time.sleep(3)  # Wait for browser to start
-        print(f"✅ Browser started for profile '{profile_name}' (PID: {self.process_pid}).")
+        self.profile_name = profile_name
+        self._register_launch(profile_name)
         try:
-            self.playwright_instance = sync_playwright().start()
-            self.browser = self.playwright_instance.chromium.connect_over_cdp(f"http://127.0.0.1:{self.debug_port}")
-            contexts = self.browser.contexts
-            self.page = contexts[0].pages[0] if contexts and contexts[0].pages else self.browser.new_page()
+            with self._timed("cdp_ready", profile_name):
+                self._wait_for_cdp()
+            print(f"✅ Browser started for profile '{profile_name}' (PID: {self.process_pid}).")
+            with self._timed("connect_over_cdp", profile_name):
+                self.playwright_instance = self._start_playwright()
+                self.browser = self.playwright_instance.chromium.connect_over_cdp(f"http://127.0.0.1:{self.debug_port}")
+            with self._timed("page_acquire"):
+                contexts = self.browser.contexts
+                if contexts:
+                    self._watch_pages(contexts[0])
+                self.page = contexts[0].pages[0] if contexts and contexts[0].pages else self.browser.new_page()
+                if self.keep_warm:
+                    # Keep the first tab as an anchor so closing the caller's page never quits the browser.
+                    self._warm_anchor = self.page
+                    self._warm_async = False
+                    self.page = self.page.context.new_page()
+            self._set_resource_blocking(self.page.context, block_resources)
             if url:
-                self.page.goto(url, timeout=timeout)
-                self.page.wait_for_load_state('load', timeout=timeout)
+                self._navigate(url, timeout, 'load')
             return self.page
         except Exception as e:
             print(f"Failed to connect to browser: {e}")
-            self.close_browser()
+            self.close_browser(force=True)
             raise
 
-    async def connect_to_browser_async(self, profile_name, url=None, headless=False, timeout=60000):
+    async def connect_to_browser_async(self, profile_name, url=None, headless=False, timeout=60000,
+                                       block_resources=None, launch_args=None):
         """Start browser with the specified profile and connect via Playwright (async)."""
+        if self._idle_since is not None:
+            if self._can_reattach(profile_name, is_async=True):
+                return await self._reattach_warm_async(url, timeout, block_resources)
+            await self.close_browser_async(force=True)
         if not self.profile_exists(profile_name):
             raise ValueError(f"Profile '{profile_name}' does not exist. Create it first.")
         if not self._is_port_open(self.debug_port):
             raise RuntimeError(f"Port {self.debug_port} is in use. Choose another port.")
-        user_data_dir = self.get_profile_path(profile_name)
-        args = [
-            self.browser_path,
-            f"--remote-debugging-port={self.debug_port}",
-            f"--user-data-dir={user_data_dir}",
-            "--no-first-run",
-            "--no-default-browser-check",
-            "--disable-features=BraveShields",
-            "--brave-ads-service-enabled=0",
-        ]
-        if headless:
-            args.append("--headless=new")
-        self.browser_process = subprocess.Popen(args, shell=False, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
-                                                stderr=subprocess.PIPE)
+        await asyncio.get_running_loop().run_in_executor(None, self._apply_compact_policy, profile_name)
+        args = self._build_args(profile_name, headless, launch_args)
+        with self._timed("spawn", profile_name):
+            self.browser_process = await self._spawn_async(args)
         self.process_pid = self.browser_process.pid
-        print(f"✅ Browser started for profile '{profile_name}' (PID: {self.process_pid}).")
-
-        # Wait a moment for browser to start
-        time.sleep(2)
+        self.profile_name = profile_name
+        self._register_launch(profile_name)
 
         try:
-            self.playwright_instance = await async_playwright().start()
-            self.browser = await self.playwright_instance.chromium.connect_over_cdp(
-                f"http://127.0.0.1:{self.debug_port}")
-            contexts = self.browser.contexts
-            if contexts and contexts[0].pages:
-                self.page = contexts[0].pages[0]
-            else:
-                self.page = await self.browser.new_page()
+            with self._timed("cdp_ready", profile_name):
+                await self._wait_for_cdp_async()
+            print(f"✅ Browser started for profile '{profile_name}' (PID: {self.process_pid}).")
+            with self._timed("connect_over_cdp", profile_name):
+                self.playwright_instance = await self._start_playwright_async()
+                self.browser = await self.playwright_instance.chromium.connect_over_cdp(
+                    f"http://127.0.0.1:{self.debug_port}")
+            with self._timed("page_acquire"):
+                contexts = self.browser.contexts
+                if contexts:
+                    self._watch_pages(contexts[0])
+                if contexts and contexts[0].pages:
+                    self.page = contexts[0].pages[0]
+                else:
+                    self.page = await self.browser.new_page()
+                if self.keep_warm:
+                    self._warm_anchor = self.page
+                    self._warm_async = True
+                    self.page = await self.page.context.new_page()
+            await self._set_resource_blocking_async(self.page.context, block_resources)
 
             if url:
-                await self.page.goto(url, timeout=timeout)
-                await self.page.wait_for_load_state('load', timeout=timeout)
+                await self._navigate_async(url, timeout, 'load')
             return self.page
         except Exception as e:
             print(f"Failed to connect to browser: {e}")
-            await self.close_browser_async()
+            await self.close_browser_async(force=True)
+            raise
+
+    def _navigate(self, url, timeout, load_state, page=None, rotator=None, proxy=None):
+        """
+        goto + wait_for_load_state on page (default: self.page), timing both phases.
+        With a ProxyRotator, the outcome and latency are reported against proxy.
+        """
+        page = page or self.page
+        started = time.perf_counter()
+        try:
+            with self._timed("goto"):
+                response = page.goto(url, timeout=timeout)
+            with self._timed("load_state"):
+                page.wait_for_load_state(load_state, timeout=timeout)
+        except Exception:
+            if rotator is not None:
+                rotator.report(proxy, ok=False)
+            raise
+        if rotator is not None:
+            rotator.report_response(proxy, response.status if response else None, time.perf_counter() - started)
+        return response
+
+    async def _navigate_async(self, url, timeout, load_state, page=None, rotator=None, proxy=None):
+        """Async version of _navigate."""
+        page = page or self.page
+        started = time.perf_counter()
+        try:
+            with self._timed("goto"):
+                response = await page.goto(url, timeout=timeout)
+            with self._timed("load_state"):
+                await page.wait_for_load_state(load_state, timeout=timeout)
+        except Exception:
+            if rotator is not None:
+                rotator.report(proxy, ok=False)
+            raise
+        if rotator is not None:
+            rotator.report_response(proxy, response.status if response else None, time.perf_counter() - started)
+        return response
+
+    @staticmethod
+    def _pick_proxy(proxy, key):
+        """Resolve a ProxyRotator to one of its proxies. Returns (rotator or None, proxy dict)."""
+        if isinstance(proxy, ProxyRotator):
+            return proxy, proxy.acquire(key)
+        return None, proxy
+
+    # ------------------------------------------------------------------ Resource blocking
+    def _set_resource_blocking(self, context, block_resources):
+        """Replace this manager's request-blocking route on context (None removes it)."""
+        if self._route_handler is not None:
+            try:
+                context.unroute("**/*", self._route_handler)
+            except Exception:
+                pass
+            self._route_handler = None
+        if block_resources:
+            self._route_handler = make_route_handler(resolve_block_spec(block_resources))
+            context.route("**/*", self._route_handler)
+
+    async def _set_resource_blocking_async(self, context, block_resources):
+        """Async version of _set_resource_blocking."""
+        if self._route_handler is not None:
+            try:
+                await context.unroute("**/*", self._route_handler)
+            except Exception:
+                pass
+            self._route_handler = None
+        if block_resources:
+            self._route_handler = make_async_route_handler(resolve_block_spec(block_resources))
+            await context.route("**/*", self._route_handler)
+
+    # ------------------------------------------------------------------ Keep-warm
+    def _warm_expired(self):
+        return self._idle_since is not None and time.monotonic() - self._idle_since > self.warm_ttl
+
+    def _can_reattach(self, profile_name, is_async):
+        """True if the idle warm browser can serve profile_name."""
+        return (
+            profile_name == self.profile_name
+            and is_async == self._warm_async
+            and not self._warm_expired()
+            and self.browser is not None
+            and self.browser.is_connected()
+            and self.browser_process is not None
+            and self._process_exit_code() is None
+        )
+
+    def _reattach_warm(self, url, timeout, block_resources=None):
+        """Hand out a fresh page from the idle warm browser."""
+        self._idle_since = None
+        self._set_resource_blocking(self._warm_anchor.context, block_resources)
+        with self._timed("page_acquire"):
+            self.page = self._warm_anchor.context.new_page()
+        print(f"♻️ Reusing warm browser for profile '{self.profile_name}' (PID: {self.process_pid}).")
+        if url:
+            self._navigate(url, timeout, 'load')
+        return self.page
+
+    async def _reattach_warm_async(self, url, timeout, block_resources=None):
+        """Async version of _reattach_warm."""
+        self._idle_since = None
+        await self._set_resource_blocking_async(self._warm_anchor.context, block_resources)
+        with self._timed("page_acquire"):
+            self.page = await self._warm_anchor.context.new_page()
+        print(f"♻️ Reusing warm browser for profile '{self.profile_name}' (PID: {self.process_pid}).")
+        if url:
+            await self._navigate_async(url, timeout, 'load')
+        return self.page
+
+    def _park_warm(self):
+        """Close every page except the anchor and mark the browser idle. Returns False if it cannot be parked."""
+        if not (self._warm_anchor and self.browser and self.browser.is_connected()) or self._warm_async:
+            return False
+        try:
+            self._close_session_contexts()
+            for page in list(self._warm_anchor.context.pages):
+                if page is not self._warm_anchor:
+                    page.close()
+            self._warm_anchor.goto("about:blank")
+        except Exception as e:
+            print(f"Error parking warm browser: {e}")
+            return False
+        self.page = None
+        self._idle_since = time.monotonic()
+        print(f"💤 Browser kept warm for profile '{self.profile_name}' (idle TTL {self.warm_ttl}s).")
+        return True
+
+    async def _park_warm_async(self):
+        """Async version of _park_warm."""
+        if not (self._warm_anchor and self.browser and self.browser.is_connected()) or not self._warm_async:
+            return False
+        try:
+            await self._close_session_contexts_async()
+            for page in list(self._warm_anchor.context.pages):
+                if page is not self._warm_anchor:
+                    await page.close()
+            await self._warm_anchor.goto("about:blank")
+        except Exception as e:
+            print(f"Error parking warm browser: {e}")
+            return False
+        self.page = None
+        self._idle_since = time.monotonic()
+        print(f"💤 Browser kept warm for profile '{self.profile_name}' (idle TTL {self.warm_ttl}s).")
+        return True
+
+    def _unpark(self):
+        """
+        Mark a parked warm browser as in use again before opening session or proxy contexts on it,
+        so close_browser() parks it (closing those contexts) instead of returning early.
+        """
+        self._idle_since = None
+
+    def evict_idle(self):
+        """Fully close the warm browser if it has been idle longer than warm_ttl. Returns True if evicted."""
+        if self._warm_expired():
+            print(f"Evicting idle warm browser for profile '{self.profile_name}'.")
+            self.close_browser(force=True)
+            return True
+        return False
+
+    async def evict_idle_async(self):
+        """Async version of evict_idle."""
+        if self._warm_expired():
+            print(f"Evicting idle warm browser for profile '{self.profile_name}'.")
+            await self.close_browser_async(force=True)
+            return True
+        return False
+
+    # ------------------------------------------------------------------ Leak checking
+    def _track(self, kind, obj):
+        """Register a driver, context or page with the leak tracker (no-op unless leak_check is set)."""
+        if self._leaks:
+            self._leaks.track(kind, obj)
+
+    def _watch_pages(self, context):
+        """Track pages opened later in a context this manager did not create."""
+        if self._leaks:
+            self._leaks.watch_pages(context)
+
+    def open_resources(self):
+        """{kind: count} of tracked drivers, contexts and pages currently open (needs leak_check)."""
+        return self._leaks.counts() if self._leaks else {}
+
+    # ------------------------------------------------------------------ Session state
+    def export_session(self, profile_name, path=None, origins=None, headless=True, timeout=30000):
+        """
+        Export a profile's cookies and localStorage as a Playwright storage state.
+        Uses the running browser if it already has profile_name open, otherwise launches it and closes it again.
+        :param path: Also write the state here; a path ending in .gz is gzip-compressed.
+        :param origins: URLs whose localStorage should be captured (each origin is opened once).
+        :return: The storage state dict ({"cookies": [...], "origins": [...]}).
+        """
+        launched = self._needs_export_launch(profile_name, is_async=False)
+        if launched:
+            self.connect_to_browser(profile_name, headless=headless)
+        try:
+            context = (self._warm_anchor or self.page).context
+            for origin in origins_of(origins):
+                page = context.new_page()
+                try:
+                    page.goto(origin, timeout=timeout)
+                finally:
+                    page.close()
+            state = context.storage_state()
+        finally:
+            if launched:
+                self.close_browser()
+        return self._finish_export(profile_name, state, path)
+
+    async def export_session_async(self, profile_name, path=None, origins=None, headless=True, timeout=30000):
+        """Async version of export_session."""
+        launched = self._needs_export_launch(profile_name, is_async=True)
+        if launched:
+            await self.connect_to_browser_async(profile_name, headless=headless)
+        try:
+            context = (self._warm_anchor or self.page).context
+            for origin in origins_of(origins):
+                page = await context.new_page()
+                try:
+                    await page.goto(origin, timeout=timeout)
+                finally:
+                    await page.close()
+            state = await context.storage_state()
+        finally:
+            if launched:
+                await self.close_browser_async()
+        return self._finish_export(profile_name, state, path)
+
+    def _needs_export_launch(self, profile_name, is_async):
+        """True if export_session has to launch profile_name itself rather than read the running browser."""
+        if self._idle_since is not None:
+            return not self._can_reattach(profile_name, is_async)
+        if self.browser is not None and self.profile_name == profile_name:
+            return False
+        if self.browser_process is not None:
+            raise RuntimeError(f"Browser for profile '{self.profile_name}' is in use. Close it before exporting "
+                               f"'{profile_name}'.")
+        return True
+
+    def _finish_export(self, profile_name, state, path):
+        if path:
+            save_state(state, path)
+        print(f"🍪 Exported {len(state.get('cookies', []))} cookies and {len(state.get('origins', []))} "
+              f"localStorage origins from profile '{profile_name}'" + (f" to {path}" if path else ""))
+        return state
+
+    def _scratch_host_profile(self):
+        """Create an empty throwaway profile to host session contexts; deleted when the browser closes."""
+        name = f"session-host-{uuid.uuid4().hex[:8]}"
+        make_ephemeral_dir(clone_dir(self.base_profile_dir), name)
+        return name
+
+    def connect_with_session(self, state, url=None, host_profile=None, headless=True, timeout=60000,
+                             block_resources=None, **context_options):
+        """
+        Open an isolated context with a saved session (see export_session) on the running browser.
+        If no browser is running, a host is launched first: host_profile, or an empty throwaway profile.
+        One host can carry many such contexts, each far cheaper than a browser process per profile.
+        :param state: Storage state dict, or a path to a .json / .json.gz file.
+        :param context_options: Passed to browser.new_context (proxy, viewport, locale, ...).
+        :return: A page in the new context. Close it with close_session or close_browser.
+        """
+        state = load_state(state)
+        if self.browser is None:
+            self.connect_to_browser(host_profile or self._scratch_host_profile(), headless=headless)
+        self._unpark()
+        with self._timed("page_acquire"):
+            context = self.browser.new_context(storage_state=state, **context_options)
+            self._track("context", context)
+            self._extra_contexts.append(context)
+            if block_resources:
+                context.route("**/*", make_route_handler(resolve_block_spec(block_resources)))
+            page = context.new_page()
+        print(f"🔑 Session context opened ({len(state.get('cookies', []))} cookies, "
+              f"{len(self._extra_contexts)} session context(s) on this browser).")
+        if url:
+            self._navigate(url, timeout, "load", page=page)
+        return page
+
+    async def connect_with_session_async(self, state, url=None, host_profile=None, headless=True, timeout=60000,
+                                         block_resources=None, **context_options):
+        """Async version of connect_with_session."""
+        state = load_state(state)
+        if self.browser is None:
+            await self.connect_to_browser_async(host_profile or self._scratch_host_profile(), headless=headless)
+        self._unpark()
+        with self._timed("page_acquire"):
+            context = await self.browser.new_context(storage_state=state, **context_options)
+            self._track("context", context)
+            self._extra_contexts.append(context)
+            if block_resources:
+                await context.route("**/*", make_async_route_handler(resolve_block_spec(block_resources)))
+            page = await context.new_page()
+        print(f"🔑 Session context opened ({len(state.get('cookies', []))} cookies, "
+              f"{len(self._extra_contexts)} session context(s) on this browser).")
+        if url:
+            await self._navigate_async(url, timeout, "load", page=page)
+        return page
+
+    def _session_context_of(self, page_or_context):
+        context = getattr(page_or_context, "context", page_or_context)
+        if context not in self._extra_contexts:
+            raise ValueError("Not a context opened by connect_with_session or add_proxy_context.")
+        self._extra_contexts.remove(context)
+        for name, proxy_context in list(self.proxy_contexts.items()):
+            if proxy_context is context:
+                del self.proxy_contexts[name]
+        return context
+
+    def close_session(self, page_or_context):
+        """Close one session context (and its pages), leaving the host browser running."""
+        self._session_context_of(page_or_context).close()
+
+    async def close_session_async(self, page_or_context):
+        """Async version of close_session."""
+        await self._session_context_of(page_or_context).close()
+
+    def _close_session_contexts(self):
+        contexts, self._extra_contexts = self._extra_contexts, []
+        self.proxy_contexts = {}
+        for context in contexts:
+            try:
+                context.close()
+            except Exception as e:
+                print(f"Error closing context: {e}")
+        if contexts:
+            print(f"Closed {len(contexts)} extra context(s)")
+
+    async def _close_session_contexts_async(self):
+        contexts, self._extra_contexts = self._extra_contexts, []
+        self.proxy_contexts = {}
+        for context in contexts:
+            try:
+                await context.close()
+            except Exception as e:
+                print(f"Error closing context: {e}")
+        if contexts:
+            print(f"Closed {len(contexts)} extra context(s)")
+
+    def _launch_browser_clean(self, profile_name, headless=False, launch_args=None):
+        self._apply_compact_policy(profile_name)
+        args = self._build_args(profile_name, headless, launch_args)
+
+        with self._timed("spawn", profile_name):
+            self.browser_process = self._spawn(args)
+        self.process_pid = self.browser_process.pid
+        self.profile_name = profile_name
+        self._register_launch(profile_name)
+        try:
+            with self._timed("cdp_ready", profile_name):
+                self._wait_for_cdp()
+        except Exception:
+            self._abort_launch()
             raise
 
-    def _launch_browser_clean(self, profile_name, headless=False):
-        user_data_dir = os.path.join(self.base_profile_dir, profile_name)
-        args = [
-            self.browser_path,
-            f"--remote-debugging-port={self.debug_port}",
-            f"--user-data-dir={user_data_dir}",
-            "--no-first-run",
-            "--no-default-browser-check",
-        ]
-        if headless:
-            args.append("--headless=new")
-
-        self.browser_process = subprocess.Popen(args)
+    async def _launch_browser_clean_async(self, profile_name, headless=False, launch_args=None):
+        """Async version of _launch_browser_clean: spawn with asyncio and wait for DevTools without blocking."""
+        await asyncio.get_running_loop().run_in_executor(None, self._apply_compact_policy, profile_name)
+        args = self._build_args(profile_name, headless, launch_args)
+
+        with self._timed("spawn", profile_name):
+            self.browser_process = await self._spawn_async(args)
         self.process_pid = self.browser_process.pid
-        time.sleep(5)
+        self.profile_name = profile_name
+        self._register_launch(profile_name)
+        try:
+            with self._timed("cdp_ready", profile_name):
+                await self._wait_for_cdp_async()
+        except Exception:
+            await self._abort_launch_async()
+            raise
+
+    def _abort_launch(self):
+        """Kill a browser whose DevTools endpoint never came up."""
+        if self.process_pid:
+            self._terminate_process_tree(self.process_pid)
+            unregister_browser(self.process_pid)
+            self._output.detach()
+        self._forget_launch()
+
+    async def _abort_launch_async(self):
+        """Async version of _abort_launch; the process tree is terminated on an executor thread."""
+        if self.process_pid:
+            await asyncio.get_running_loop().run_in_executor(None, self._terminate_process_tree, self.process_pid)
+            unregister_browser(self.process_pid)
+            await self._output.detach_async()
+        await self._discard_ephemeral_async(self.profile_name)
+        self._forget_launch()
+
+    def _forget_launch(self):
+        self.browser_process = None
+        self.process_pid = None
+        self._discard_ephemeral(self.profile_name)
+        self.profile_name = None
 
     def _apply_anti_detection(self, context):
-        context.add_init_script("""
-            () => {
-                Object.defineProperty(navigator, 'webdriver', { get: () => false });
-                Object.defineProperty(navigator, 'languages', { get: () => ['en-US', 'en'] });
-                Object.defineProperty(navigator, 'plugins', { get: () => [1,2,3,4,5] });
-                Object.defineProperty(navigator, 'hardwareConcurrency', { get: () => 8 });
-                window.chrome = window.chrome || {};
-                delete navigator.__proto__.webdriver;
-            }
-        """)
+        context.add_init_script(_ANTI_DETECTION_SCRIPT)
+
+    async def _apply_anti_detection_async(self, context):
+        await context.add_init_script(_ANTI_DETECTION_SCRIPT)
 
     def connect_to_browser_with_proxy(
             self,
             profile_name: str,
-            proxy: dict,
+            proxy,
             url: str = None,
             headless: bool = False,
-            timeout: int = 60000
+            timeout: int = 60000,
+            block_resources=None,
+            launch_args=None
     ):
-        self._launch_browser_clean(profile_name, headless=headless)
-
-        self.playwright = sync_playwright().start()
-        self.browser = self.playwright.chromium.connect_over_cdp(f"http://127.0.0.1:{self.debug_port}")
-
-        # Smart country detection
-        country = None
-        if "username" in proxy:
-            country = country_from_dataimpulse_username(proxy["username"])
-        if not country and proxy["server"]:
-            host = proxy["server"].split("://")[-1].split(":")[0]
-            country = detect_country(host)
-
-        fp = FINGERPRINTS.get(country, DEFAULT_FINGERPRINT)
-        print(f"Using fingerprint → Country: {country or 'US'} | Timezone: {fp['tz']} | Locale: {fp['locale']}")
-
-        context_args = {
-            "proxy": proxy,
-            "timezone_id": fp["tz"],
-            "locale": fp["locale"],
-            # "viewport": {"width": fp["res"][0], "height": fp["res"][1]},
-            "ignore_https_errors": True,
-        }
-
-        self.context = self.browser.new_context(**context_args)
-        self._apply_anti_detection(self.context)
-        self.page = self.context.new_page()
+        """
+        Launch profile_name and open a context routed through proxy with a matching fingerprint.
+        :param proxy: A Playwright proxy dict, or a ProxyRotator that keeps this profile on a sticky,
+                      healthy proxy and is told how the navigation went.
+        """
+        if self._idle_since is not None:
+            self.close_browser(force=True)
+        rotator, proxy = self._pick_proxy(proxy, profile_name)
+        self._launch_browser_clean(profile_name, headless=headless, launch_args=launch_args)
+        try:
+            with self._timed("connect_over_cdp", profile_name):
+                self.playwright_instance = self._start_playwright()
+                self.browser = self.playwright_instance.chromium.connect_over_cdp(f"http://127.0.0.1:{self.debug_port}")
 
-        if url:
-            print(f"Going to {url}...")
-            self.page.goto(url, timeout=timeout)
-            self.page.wait_for_load_state("networkidle", timeout=timeout)
+            # Smart country detection
+            country = proxy_country(proxy)
+            fp = FINGERPRINTS.get(country, DEFAULT_FINGERPRINT)
+            print(f"Using fingerprint → Country: {country or 'US'} | Timezone: {fp['tz']} | Locale: {fp['locale']}")
+            context_args = fingerprint_context_args(proxy, country, viewport=False)
+
+            with self._timed("page_acquire", profile_name):
+                self.context = self.browser.new_context(**context_args)
+                self._track("context", self.context)
+                self._apply_anti_detection(self.context)
+                self._set_resource_blocking(self.context, block_resources)
+                self.page = self.context.new_page()
+
+            if url:
+                print(f"Going to {url}...")
+                self._navigate(url, timeout, "networkidle", rotator=rotator, proxy=proxy)
+        except Exception as e:
+            print(f"Failed to connect to browser: {e}")
+            self.close_browser(force=True)
+            raise
 
         print("Browser ready with PERFECT proxy + fingerprint")
         return self.page
@@ -377,53 +1055,181 @@ class BrowserManager:
     async def connect_to_browser_async_with_proxy(
             self,
             profile_name: str,
-            proxy: dict,
+            proxy,
             url: str = None,
             headless: bool = False,
-            timeout: int = 60000
+            timeout: int = 60000,
+            block_resources=None,
+            launch_args=None
     ):
         """
         Async version of connect_to_browser_with_proxy
         Perfect for asyncio scripts, concurrent scraping, etc.
         """
-        self._launch_browser_clean(profile_name, headless=headless)
+        if self._idle_since is not None:
+            await self.close_browser_async(force=True)
+        rotator, proxy = self._pick_proxy(proxy, profile_name)
+        await self._launch_browser_clean_async(profile_name, headless=headless, launch_args=launch_args)
 
-        self.playwright = await async_playwright().start()
-        self.browser = await self.playwright.chromium.connect_over_cdp(f"http://127.0.0.1:{self.debug_port}")
+        try:
+            with self._timed("connect_over_cdp", profile_name):
+                self.playwright_instance = await self._start_playwright_async()
+                self.browser = await self.playwright_instance.chromium.connect_over_cdp(
+                    f"http://127.0.0.1:{self.debug_port}")
 
-        # Smart country detection (DataImpulse + fallback to IP)
-        country = None
-        if "username" in proxy:
-            country = country_from_dataimpulse_username(proxy["username"])
-        if not country and proxy.get("server"):
-            host = proxy["server"].split("://")[-1].split(":")[0].split("@")[-1]
-            country = detect_country(host)
+            # Smart country detection (DataImpulse + fallback to IP)
+            country = await proxy_country_async(proxy)
+            fp = FINGERPRINTS.get(country, DEFAULT_FINGERPRINT)
+            print(f"[Async] Using fingerprint → Country: {country or 'US'} | Timezone: {fp['tz']} | Locale: {fp['locale']}")
+            context_args = fingerprint_context_args(proxy, country)
 
-        fp = FINGERPRINTS.get(country, DEFAULT_FINGERPRINT)
-        print(f"[Async] Using fingerprint → Country: {country or 'US'} | Timezone: {fp['tz']} | Locale: {fp['locale']}")
+            with self._timed("page_acquire", profile_name):
+                self.context = await self.browser.new_context(**context_args)
+                self._track("context", self.context)
+                await self._apply_anti_detection_async(self.context)
+                await self._set_resource_blocking_async(self.context, block_resources)
+                self.page = await self.context.new_page()
 
-        context_args = {
-            "proxy": proxy,
-            "timezone_id": fp["tz"],
-            "locale": fp["locale"],
-            "viewport": {"width": fp["res"][0], "height": fp["res"][1]},
-            "ignore_https_errors": True,
-        }
+            if url:
+                print(f"[Async] Going to {url}...")
+                await self._navigate_async(url, timeout, "networkidle", rotator=rotator, proxy=proxy)
+        except Exception as e:
+            print(f"[Async] Failed to connect to browser: {e}")
+            await self.close_browser_async(force=True)
+            raise
 
-        self.context = await self.browser.new_context(**context_args)
-        self._apply_anti_detection(self.context)
-        self.page = await self.context.new_page()
+        print("[Async] Browser ready with proxy + perfect fingerprint spoofing")
+        return self.page
 
+    # ------------------------------------------------------------------ Many proxy contexts, one browser
+    def add_proxy_context(self, proxy, url=None, name=None, host_profile=None, headless=True, timeout=60000,
+                          block_resources=None, viewport=True):
+        """
+        Open another isolated context on the running browser with its own proxy and matching
+        timezone/locale fingerprint. If no browser is running, a host is launched first
+        (host_profile, or an empty throwaway profile). Many geo sessions then share one browser process.
+        :param proxy: A Playwright proxy dict, or a ProxyRotator (sticky per name).
+        :param name: Key in self.proxy_contexts (default: "<country>-<n>").
+        :return: (name, page)
+        """
+        if self.browser is None:
+            self.connect_to_browser(host_profile or self._scratch_host_profile(), headless=headless)
+        self._unpark()
+        rotator, proxy = self._pick_proxy(proxy, name)
+        country = proxy_country(proxy)
+        name = self._proxy_context_name(name, country)
+        with self._timed("page_acquire"):
+            context = self.browser.new_context(**fingerprint_context_args(proxy, country, viewport))
+            self._track("context", context)
+            self._extra_contexts.append(context)
+            self.proxy_contexts[name] = context
+            try:
+                self._apply_anti_detection(context)
+                if block_resources:
+                    context.route("**/*", make_route_handler(resolve_block_spec(block_resources)))
+                page = context.new_page()
+            except Exception:
+                self._forget_proxy_context(name, context)
+                try:
+                    context.close()
+                except Exception:
+                    pass
+                raise
+        print(f"🌍 Proxy context '{name}' opened ({country or 'US'} fingerprint, "
+              f"{len(self.proxy_contexts)} on this browser).")
         if url:
-            print(f"[Async] Going to {url}...")
-            await self.page.goto(url, timeout=timeout)
-            await self.page.wait_for_load_state("networkidle", timeout=timeout)
+            self._navigate(url, timeout, "load", page=page, rotator=rotator, proxy=proxy)
+        return name, page
 
-        print("[Async] Browser ready with proxy + perfect fingerprint spoofing")
-        return self.page
+    async def add_proxy_context_async(self, proxy, url=None, name=None, host_profile=None, headless=True,
+                                      timeout=60000, block_resources=None, viewport=True):
+        """Async version of add_proxy_context; safe to call concurrently with asyncio.gather."""
+        if self._host_lock is None:
+            self._host_lock = asyncio.Lock()
+        async with self._host_lock:
+            if self.browser is None:
+                await self.connect_to_browser_async(host_profile or self._scratch_host_profile(), headless=headless)
+            self._unpark()
+        rotator, proxy = self._pick_proxy(proxy, name)
+        country = await proxy_country_async(proxy)
+        name = self._proxy_context_name(name, country)
+        self.proxy_contexts[name] = None  # reserve the name while the context is created
+        try:
+            with self._timed("page_acquire"):
+                context = await self.browser.new_context(**fingerprint_context_args(proxy, country, viewport))
+                self._track("context", context)
+                self._extra_contexts.append(context)
+                self.proxy_contexts[name] = context
+                try:
+                    await self._apply_anti_detection_async(context)
+                    if block_resources:
+                        await context.route("**/*", make_async_route_handler(resolve_block_spec(block_resources)))
+                    page = await context.new_page()
+                except Exception:
+                    self._forget_proxy_context(name, context)
+                    try:
+                        await context.close()
+                    except Exception:
+                        pass
+                    raise
+        finally:
+            if self.proxy_contexts.get(name, False) is None:
+                del self.proxy_contexts[name]
+        print(f"🌍 Proxy context '{name}' opened ({country or 'US'} fingerprint, "
+              f"{len(self.proxy_contexts)} on this browser).")
+        if url:
+            await self._navigate_async(url, timeout, "load", page=page, rotator=rotator, proxy=proxy)
+        return name, page
+
+    def _forget_proxy_context(self, name, context):
+        """Drop a proxy context that failed to set up from both registries, freeing its name."""
+        if context in self._extra_contexts:
+            self._extra_contexts.remove(context)
+        if self.proxy_contexts.get(name) is context:
+            del self.proxy_contexts[name]
+        if self._leaks:
+            self._leaks.closed(context)
+
+    def _proxy_context_name(self, name, country):
+        if name is None:
+            n = 1
+            while f"{country or 'US'}-{n}" in self.proxy_contexts:
+                n += 1
+            name = f"{country or 'US'}-{n}"
+        elif name in self.proxy_contexts:
+            raise ValueError(f"Proxy context '{name}' already exists.")
+        return name
+
+    def remove_proxy_context(self, name):
+        """Close the proxy context added under name, leaving the browser and other contexts running."""
+        if name not in self.proxy_contexts:
+            raise KeyError(f"No proxy context named '{name}'.")
+        self.close_session(self.proxy_contexts[name])
+        print(f"Closed proxy context '{name}'")
 
-    def close_browser(self):
-        """Close the browser and clean up all resources."""
+    async def remove_proxy_context_async(self, name):
+        """Async version of remove_proxy_context."""
+        if name not in self.proxy_contexts:
+            raise KeyError(f"No proxy context named '{name}'.")
+        await self.close_session_async(self.proxy_contexts[name])
+        print(f"Closed proxy context '{name}'")
+
+    def close_browser(self, force=False):
+        """
+        Close the browser and clean up all resources.
+        :param force: In keep_warm mode, shut the browser down instead of keeping it warm.
+        """
+        if self.keep_warm and not force:
+            if self._idle_since is not None and not self._warm_expired():
+                return
+            if self._idle_since is None and self._park_warm():
+                return
+        with self._timed("close"):
+            self._close_all()
+
+    def _close_all(self):
+        """Release pages, the Playwright connection and the browser process."""
+        self._close_session_contexts()
         if self.page:
             try:
                 self.page.close()
@@ -431,6 +1237,17 @@ class BrowserManager:
             except Exception as e:
                 print(f"Error closing page: {e}")
             self.page = None
+        if self.context:
+            try:
+                self.context.close()
+                print("Closed proxy context")
+            except Exception as e:
+                print(f"Error closing context: {e}")
+            self.context = None
+        leaks = self._leaks.collect(("page", "context")) if self._leaks else []
+        cdp_close_sent = False
+        if self.browser and self.browser_process and self.process_pid:
+            cdp_close_sent = self._send_browser_close()
         if self.browser:
             try:
                 self.browser.close()
@@ -440,29 +1257,49 @@ class BrowserManager:
             self.browser = None
         if self.playwright_instance:
             try:
-                self.playwright_instance.stop()
+                self._stop_playwright(self.playwright_instance)
                 print("Stopped Playwright instance")
             except Exception as e:
                 print(f"Error stopping Playwright: {e}")
             self.playwright_instance = None
+        if self._leaks:
+            leaks += self._leaks.collect(("driver",))
         if self.browser_process and self.process_pid:
             try:
-                self._kill_child_processes(self.process_pid)
+                with self._timed("kill"):
+                    self.last_shutdown = self._terminate_process_tree(self.process_pid, cdp_close_sent)
+                unregister_browser(self.process_pid)
             except Exception as e:
                 print(f"Error killing browser process: {e}")
-            finally:
-                try:
-                    self.browser_process.stdin.close()
-                    self.browser_process.stdout.close()
-                    self.browser_process.stderr.close()
-                except Exception:
-                    pass
+            self._output.detach()
             self.browser_process = None
             self.process_pid = None
+        self._discard_ephemeral(self.profile_name)
+        self.profile_name = None
+        self._warm_anchor = None
+        self._idle_since = None
+        self._route_handler = None
         print("✅ Browser closed.")
+        self.last_leaks = leaks
+        if self._leaks:
+            self._leaks.report(leaks)
+
+    async def close_browser_async(self, force=False):
+        """
+        Close the browser and clean up all resources (async).
+        :param force: In keep_warm mode, shut the browser down instead of keeping it warm.
+        """
+        if self.keep_warm and not force:
+            if self._idle_since is not None and not self._warm_expired():
+                return
+            if self._idle_since is None and await self._park_warm_async():
+                return
+        with self._timed("close"):
+            await self._close_all_async()
 
-    async def close_browser_async(self):
-        """Close the browser and clean up all resources (async)."""
+    async def _close_all_async(self):
+        """Async version of _close_all."""
+        await self._close_session_contexts_async()
         if self.page:
             try:
                 await self.page.close()
@@ -470,6 +1307,17 @@ class BrowserManager:
             except Exception as e:
                 print(f"Error closing page: {e}")
             self.page = None
+        if self.context:
+            try:
+                await self.context.close()
+                print("Closed proxy context")
+            except Exception as e:
+                print(f"Error closing context: {e}")
+            self.context = None
+        leaks = self._leaks.collect(("page", "context")) if self._leaks else []
+        cdp_close_sent = False
+        if self.browser and self.browser_process and self.process_pid:
+            cdp_close_sent = await self._send_browser_close_async()
         if self.browser:
             try:
                 await self.browser.close()
@@ -479,26 +1327,34 @@ class BrowserManager:
             self.browser = None
         if self.playwright_instance:
             try:
-                await self.playwright_instance.stop()
+                await self._stop_playwright_async(self.playwright_instance)
                 print("Stopped Playwright instance")
             except Exception as e:
                 print(f"Error stopping Playwright: {e}")
             self.playwright_instance = None
+        if self._leaks:
+            leaks += self._leaks.collect(("driver",))
         if self.browser_process and self.process_pid:
             try:
-                self._kill_child_processes(self.process_pid)
+                loop = asyncio.get_running_loop()
+                with self._timed("kill"):
+                    self.last_shutdown = await loop.run_in_executor(
+                        None, self._terminate_process_tree, self.process_pid, cdp_close_sent)
+                unregister_browser(self.process_pid)
             except Exception as e:
                 print(f"Error killing browser process: {e}")
-            finally:
-                try:
-                    self.browser_process.stdin.close()
-                    self.browser_process.stdout.close()
-                    self.browser_process.stderr.close()
-                except Exception:
-                    pass
+            await self._output.detach_async()
             self.browser_process = None
             self.process_pid = None
+        await self._discard_ephemeral_async(self.profile_name)
+        self.profile_name = None
+        self._warm_anchor = None
+        self._idle_since = None
+        self._route_handler = None
         print("✅ Browser closed.")
+        self.last_leaks = leaks
+        if self._leaks:
+            self._leaks.report(leaks)
 
 
 
@@ -506,7 +1362,7 @@ class BrowserManager:
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        self.close_browser()
+        self.close_browser(force=True)
         return False
 
 
@@ -0,0 +1,125 @@
+import os
+import asyncio
+import threading
+import subprocess
+from collections import deque
+
+OUTPUT_MODES = ("buffer", "devnull", "inherit")
+
+
+def _tail(path, lines):
+    """Last `lines` lines of a text file, reading only its end."""
+    try:
+        with open(path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            f.seek(max(0, size - lines * 200))
+            data = f.read()
+    except OSError:
+        return []
+    return data.decode("utf-8", errors="replace").splitlines()[-lines:]
+
+
+class BrowserOutput:
+    """
+    Where a launched browser's stdout and stderr go.
+    "buffer" merges them into one pipe that a background thread (or, for processes started with
+    asyncio.create_subprocess_exec, a task) drains into a ring buffer of the last max_lines lines,
+    so a chatty browser can never block on a full pipe. "devnull" discards the output, "inherit"
+    passes it through to this process's console, and any other string is a log file to append to.
+    """
+
+    def __init__(self, mode="buffer", max_lines=1000):
+        """
+        :param mode: "buffer", "devnull", "inherit" or a file path.
+        :param max_lines: Lines kept in "buffer" mode (and returned from a log file by lines()).
+        """
+        if not isinstance(mode, (str, os.PathLike)):
+            raise ValueError(f"Invalid browser output {mode!r}: use {', '.join(OUTPUT_MODES)} or a file path.")
+        self.mode = os.fspath(mode)
+        self.path = None if self.mode in OUTPUT_MODES else self.mode
+        self.max_lines = max_lines
+        self._lines = deque(maxlen=max_lines)
+        self._threads = []
+        self._tasks = []
+        self._file = None
+
+    def popen_kwargs(self):
+        """stdin/stdout/stderr arguments for subprocess.Popen or asyncio.create_subprocess_exec."""
+        if self.mode == "buffer":
+            out = subprocess.PIPE
+        elif self.mode == "devnull":
+            out = subprocess.DEVNULL
+        elif self.mode == "inherit":
+            out = None
+        else:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._file = open(self.path, "ab")
+            out = self._file
+        stderr = subprocess.STDOUT if out not in (None, subprocess.DEVNULL) else out
+        return {"stdin": subprocess.DEVNULL, "stdout": out, "stderr": stderr}
+
+    def release(self):
+        """Close this process's handle on the log file once the browser has been spawned with its own."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def attach(self, process):
+        """Start draining the spawned process's output pipe (buffer mode only)."""
+        self._lines.clear()
+        if isinstance(process.stdout, asyncio.StreamReader):
+            self._tasks.append(asyncio.ensure_future(self._drain_async(process.stdout)))
+        elif process.stdout is not None:
+            thread = threading.Thread(target=self._drain, args=(process.stdout,), daemon=True,
+                                      name=f"browser-{process.pid}-output")
+            thread.start()
+            self._threads.append(thread)
+
+    def _drain(self, stream):
+        try:
+            for line in iter(lambda: stream.readline(8192), b""):
+                self._lines.append(line.decode("utf-8", errors="replace").rstrip())
+        except (OSError, ValueError):
+            pass
+        finally:
+            try:
+                stream.close()
+            except OSError:
+                pass
+
+    async def _drain_async(self, stream):
+        while True:
+            try:
+                line = await stream.readline()
+            except ValueError:
+                continue  # a line longer than the stream limit was discarded
+            except OSError:
+                return
+            if not line:
+                return
+            self._lines.append(line.decode("utf-8", errors="replace").rstrip())
+
+    def detach(self, timeout=1.0):
+        """Wait briefly for the reader threads to hit end-of-file once the browser has exited."""
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    async def detach_async(self, timeout=1.0):
+        """Async version of detach; also waits for reader tasks and cancels any still running."""
+        tasks, self._tasks = self._tasks, []
+        if tasks:
+            _, pending = await asyncio.wait(tasks, timeout=timeout)
+            for task in pending:
+                task.cancel()
+        if self._threads:
+            await asyncio.get_running_loop().run_in_executor(None, self.detach, timeout)
+
+    def lines(self, last=None):
+        """The most recent output lines (all kept lines if last is None)."""
+        if self.path:
+            lines = _tail(self.path, last or self.max_lines)
+        else:
+            lines = list(self._lines)
+        return lines[-last:] if last else lines
@@ -0,0 +1,218 @@
+import asyncio
+import socket
+import threading
+from contextlib import contextmanager, asynccontextmanager
+from browser_manager import BrowserManager
+
+
+def _port_is_free(port):
+    """Return True if nothing is bound to 127.0.0.1:port."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        try:
+            s.bind(("127.0.0.1", port))
+        except OSError:
+            return False
+    return True
+
+
+class BrowserPool:
+    def __init__(self, max_browsers=4, port_range=(9300, 9400), base_profile_dir=None, browser_path=None, **manager_kwargs):
+        """
+        Own up to max_browsers Chromium processes, each on its own leased debug port.
+        :param max_browsers: Maximum number of browsers running at once.
+        :param port_range: (start, stop) range of debug ports to lease from.
+        :param base_profile_dir: Passed to every BrowserManager.
+        :param browser_path: Passed to every BrowserManager (auto-detected once if None).
+        :param manager_kwargs: Extra keyword arguments for BrowserManager.
+        Use either the sync (acquire/release) or the async (acquire_async/release_async) API on one pool, not both.
+        """
+        if max_browsers < 1:
+            raise ValueError("max_browsers must be at least 1.")
+        self.max_browsers = max_browsers
+        self.ports = range(*port_range)
+        if len(self.ports) < max_browsers:
+            raise ValueError(f"Port range {port_range} is smaller than max_browsers={max_browsers}.")
+        self.base_profile_dir = base_profile_dir
+        self.browser_path = browser_path
+        self.manager_kwargs = manager_kwargs
+        self._lock = threading.Lock()
+        self._leased_ports = set()
+        self._leased_profiles = {}
+        self._active = {}
+        self._slots = threading.BoundedSemaphore(max_browsers)
+        self._async_slots = None
+
+    # ------------------------------------------------------------------ Leasing
+    def _lease(self, profile_name):
+        """Reserve a free debug port for profile_name."""
+        with self._lock:
+            if profile_name in self._leased_profiles:
+                raise RuntimeError(f"Profile '{profile_name}' is already running in this pool.")
+            for port in self.ports:
+                if port not in self._leased_ports and _port_is_free(port):
+                    self._leased_ports.add(port)
+                    self._leased_profiles[profile_name] = port
+                    return port
+        raise RuntimeError(f"No free debug port in range {self.ports.start}-{self.ports.stop - 1}.")
+
+    def _unlease(self, profile_name):
+        with self._lock:
+            port = self._leased_profiles.pop(profile_name, None)
+            self._leased_ports.discard(port)
+
+    def _new_manager(self, port):
+        manager = BrowserManager(
+            base_profile_dir=self.base_profile_dir,
+            browser_path=self.browser_path,
+            debug_port=port,
+            **self.manager_kwargs,
+        )
+        # Detect the executable once, not once per browser.
+        self.browser_path = manager.browser_path
+        return manager
+
+    @property
+    def active(self):
+        """Managers currently handed out by the pool."""
+        return list(self._active)
+
+    # ------------------------------------------------------------------ Sync API
+    def acquire(self, profile_name, url=None, headless=False, timeout=60000, block=True, **connect_kwargs):
+        """
+        Launch a browser for profile_name on a leased port and return its connected BrowserManager.
+        Blocks while max_browsers are already running unless block=False.
+        """
+        if not self._slots.acquire(blocking=block):
+            raise RuntimeError(f"Pool is full ({self.max_browsers} browsers running).")
+        try:
+            port = self._lease(profile_name)
+        except Exception:
+            self._slots.release()
+            raise
+        try:
+            manager = self._new_manager(port)
+            manager.connect_to_browser(profile_name, url=url, headless=headless, timeout=timeout, **connect_kwargs)
+        except Exception:
+            self._unlease(profile_name)
+            self._slots.release()
+            raise
+        self._active[manager] = profile_name
+        return manager
+
+    def release(self, manager):
+        """Close a browser obtained from acquire() and free its port and slot."""
+        if manager not in self._active:
+            raise ValueError("Manager was not acquired from this pool.")
+        try:
+            manager.close_browser(force=True)
+        finally:
+            self._unlease(self._active.pop(manager))
+            self._slots.release()
+
+    @contextmanager
+    def browser(self, profile_name, **kwargs):
+        """Context manager around acquire()/release()."""
+        manager = self.acquire(profile_name, **kwargs)
+        try:
+            yield manager
+        finally:
+            self.release(manager)
+
+    def close_all(self):
+        """Release every browser still held."""
+        for manager in self.active:
+            self.release(manager)
+
+    # ------------------------------------------------------------------ Async API
+    def _get_async_slots(self):
+        if self._async_slots is None:
+            self._async_slots = asyncio.Semaphore(self.max_browsers)
+        return self._async_slots
+
+    async def acquire_async(self, profile_name, url=None, headless=False, timeout=60000, **connect_kwargs):
+        """Async version of acquire(); waits for a free slot without blocking the event loop."""
+        slots = self._get_async_slots()
+        await slots.acquire()
+        try:
+            port = self._lease(profile_name)
+        except Exception:
+            slots.release()
+            raise
+        manager = None
+        try:
+            manager = self._new_manager(port)
+            await manager.connect_to_browser_async(profile_name, url=url, headless=headless, timeout=timeout,
+                                                   **connect_kwargs)
+        except BaseException:
+            # Also clean up on cancellation, e.g. when launch_many() is abandoned mid-launch.
+            if manager is not None and manager.process_pid:
+                await manager.close_browser_async(force=True)
+            self._unlease(profile_name)
+            slots.release()
+            raise
+        self._active[manager] = profile_name
+        return manager
+
+    async def release_async(self, manager):
+        """Async version of release()."""
+        if manager not in self._active:
+            raise ValueError("Manager was not acquired from this pool.")
+        try:
+            await manager.close_browser_async(force=True)
+        finally:
+            self._unlease(self._active.pop(manager))
+            self._get_async_slots().release()
+
+    @asynccontextmanager
+    async def browser_async(self, profile_name, **kwargs):
+        """Async context manager around acquire_async()/release_async()."""
+        manager = await self.acquire_async(profile_name, **kwargs)
+        try:
+            yield manager
+        finally:
+            await self.release_async(manager)
+
+    async def launch_many(self, profile_names, url=None, headless=False, timeout=60000, **connect_kwargs):
+        """
+        Launch several profiles at once, each on its own leased port, at most max_browsers at a time.
+        Yields (profile_name, manager, error) as each browser becomes ready: on success error is None
+        and manager.page is the connected page; a failing profile yields its exception and does not
+        affect the others. Successful managers stay acquired until release_async()/close_all_async().
+        """
+        async def launch(profile_name):
+            try:
+                manager = await self.acquire_async(profile_name, url=url, headless=headless, timeout=timeout,
+                                                   **connect_kwargs)
+                return profile_name, manager, None
+            except Exception as e:
+                print(f"Failed to launch profile '{profile_name}': {e}")
+                return profile_name, None, e
+
+        tasks = [asyncio.create_task(launch(name)) for name in profile_names]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            pending = [task for task in tasks if not task.done()]
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def close_all_async(self):
+        """Release every browser still held (async)."""
+        for manager in self.active:
+            await self.release_async(manager)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close_all()
+        return False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close_all_async()
+        return False
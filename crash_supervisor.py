@@ -0,0 +1,323 @@
+import time
+import asyncio
+from collections import deque
+from browser_pool import _port_is_free
+
+
+class RestartBudgetExceeded(RuntimeError):
+    """The browser crashed more often than the supervisor's restart budget allows."""
+
+
+class BrowserSupervisor:
+    """
+    Keep a BrowserManager's browser alive for unattended workers.
+    Crashes are detected from the browser process exiting (poll()), the Playwright connection's
+    "disconnected" event and the page's "crash" event. A crashed page is replaced in its context;
+    a dead browser is closed, relaunched on the same profile (on a new port if the old one is still
+    held) and its page re-established. Restarts are limited to max_restarts per restart_window.
+    Once the budget is spent, the RestartBudgetExceeded is kept in `failure` and raised by every
+    later ensure_page/run call and by close, so workers stop instead of using a dead page.
+    Use the sync (connect/ensure_page/run) or the async (connect_async/.../watch) API, not both.
+    """
+
+    def __init__(self, manager, max_restarts=5, restart_window=600, port_range=None, poll_interval=1.0,
+                 on_restart=None, on_giveup=None):
+        """
+        :param manager: The BrowserManager to supervise.
+        :param max_restarts: Restarts allowed within restart_window seconds before RestartBudgetExceeded.
+        :param port_range: (start, stop) debug ports to move to if the old port is still in use after a crash.
+        :param poll_interval: Seconds between liveness checks in watch().
+        :param on_restart: Called as on_restart(manager, page, reason) after each recovery, e.g. to log in again.
+                           May be a coroutine function with the async API.
+        :param on_giveup: Called as on_giveup(error) once when the restart budget is exhausted.
+        """
+        self.manager = manager
+        self.max_restarts = max_restarts
+        self.restart_window = restart_window
+        self.ports = range(*port_range) if port_range else None
+        self.poll_interval = poll_interval
+        self.on_restart = on_restart
+        self.on_giveup = on_giveup
+        self.failure = None  # RestartBudgetExceeded once the supervisor has given up
+        self.restarts = []  # [(timestamp, reason)]
+        self._recent = deque()
+        self._profile_name = None
+        self._proxy = None
+        self._connect_kwargs = {}
+        self._disconnected = False
+        self._crashed_page = None
+        self._browser = None
+        self._context = None
+        self._closed = False
+        self._watcher = None
+        self._recovery_lock = None
+
+    # ------------------------------------------------------------------ Detection
+    def _watch(self):
+        """Subscribe to the current browser's and page's failure events."""
+        self._crashed_page = None
+        manager = self.manager
+        if manager.browser is not None and manager.browser is not self._browser:
+            self._disconnected = False
+            self._browser = manager.browser
+            manager.browser.on("disconnected", self._on_disconnected)
+        if manager.page is not None:
+            self._context = manager.page.context
+            manager.page.on("crash", self._on_crash)
+
+    def _on_disconnected(self, browser):
+        if browser is self.manager.browser:
+            self._disconnected = True
+
+    def _on_crash(self, page):
+        if page is self.manager.page:
+            self._crashed_page = page
+
+    def crash_reason(self):
+        """
+        Why the browser needs recovering ("not connected", "browser exited with code N", "disconnected"
+        or "page crashed"), or None if it is healthy.
+        """
+        manager = self.manager
+        if manager.browser is None:
+            return "not connected"
+        exit_code = manager._process_exit_code()
+        if exit_code is not None:
+            return f"browser exited with code {exit_code}"
+        if self._disconnected or not manager.browser.is_connected():
+            return "disconnected"
+        if self._crashed_page is not None or manager.page is None or manager.page.is_closed():
+            return "page crashed"
+        return None
+
+    # ------------------------------------------------------------------ Budget
+    def _spend_restart(self, reason):
+        now = time.monotonic()
+        while self._recent and now - self._recent[0] > self.restart_window:
+            self._recent.popleft()
+        if len(self._recent) >= self.max_restarts:
+            self.failure = RestartBudgetExceeded(
+                f"Browser for profile '{self._profile_name}' needed {len(self._recent) + 1} restarts within "
+                f"{self.restart_window}s (last: {reason}); giving up.")
+            print(f"❌ {self.failure}")
+            if self.on_giveup:
+                self.on_giveup(self.failure)
+            raise self.failure
+        self._recent.append(now)
+        self.restarts.append((time.time(), reason))
+        print(f"⚠️ Recovering browser for profile '{self._profile_name}': {reason} "
+              f"(restart {len(self._recent)}/{self.max_restarts})")
+        if reason.startswith("browser exited") or reason == "disconnected":
+            for line in self.manager.browser_logs(20):
+                print(f"    {line}")
+
+    def _pick_port(self):
+        """Keep the debug port if it is free again, else move to the first free port in port_range."""
+        manager = self.manager
+        if _port_is_free(manager.debug_port) or not self.ports:
+            return
+        for port in self.ports:
+            if _port_is_free(port):
+                print(f"Port {manager.debug_port} still in use; relaunching on port {port}")
+                manager.debug_port = port
+                return
+        raise RuntimeError(f"No free debug port in range {self.ports.start}-{self.ports.stop - 1}.")
+
+    # ------------------------------------------------------------------ Sync API
+    def connect(self, profile_name, proxy=None, **connect_kwargs):
+        """
+        Connect the manager (connect_to_browser, or connect_to_browser_with_proxy if proxy is given)
+        and remember the arguments for relaunching.
+        """
+        self._profile_name = profile_name
+        self._proxy = proxy
+        self._connect_kwargs = connect_kwargs
+        self._closed = False
+        return self._connect()
+
+    def _connect(self):
+        if self._proxy is not None:
+            page = self.manager.connect_to_browser_with_proxy(self._profile_name, self._proxy, **self._connect_kwargs)
+        else:
+            page = self.manager.connect_to_browser(self._profile_name, **self._connect_kwargs)
+        self._watch()
+        return page
+
+    def ensure_page(self):
+        """Return a live page, recovering the browser first if it crashed."""
+        if self.failure is not None:
+            raise self.failure
+        reason = self.crash_reason()
+        if reason is None:
+            return self.manager.page
+        if self._profile_name is None:
+            raise RuntimeError("BrowserSupervisor.connect() has not been called.")
+        self._spend_restart(reason)
+        manager = self.manager
+        with manager._timed("restart", self._profile_name):
+            if reason == "page crashed":
+                page = self._replace_page()
+            else:
+                manager.close_browser(force=True)
+                self._pick_port()
+                page = self._connect()
+        if self.on_restart:
+            self.on_restart(manager, page, reason)
+        return page
+
+    def _replace_page(self):
+        manager = self.manager
+        if manager.page is not None:
+            try:
+                manager.page.close()
+            except Exception:
+                pass
+        manager.page = self._context.new_page()
+        self._watch()
+        url = self._connect_kwargs.get("url")
+        if url:
+            manager._navigate(url, self._connect_kwargs.get("timeout", 60000), "load")
+        return manager.page
+
+    def run(self, fn, *args, **kwargs):
+        """
+        Call fn(page, *args, **kwargs) on a live page. If it fails because the browser or page
+        crashed, recover and call it once more.
+        """
+        page = self.ensure_page()
+        try:
+            return fn(page, *args, **kwargs)
+        except Exception:
+            if self.crash_reason() is None:
+                raise
+        return fn(self.ensure_page(), *args, **kwargs)
+
+    def close(self):
+        """Close the browser; raises the stored RestartBudgetExceeded if the supervisor gave up."""
+        self._closed = True
+        self.manager.close_browser(force=True)
+        if self.failure is not None:
+            raise self.failure
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
+    # ------------------------------------------------------------------ Async API
+    async def connect_async(self, profile_name, proxy=None, watch=True, **connect_kwargs):
+        """
+        Async version of connect. With watch=True a background task checks the browser every
+        poll_interval seconds and recovers it without waiting for the next call.
+        """
+        self._profile_name = profile_name
+        self._proxy = proxy
+        self._connect_kwargs = connect_kwargs
+        self._closed = False
+        page = await self._connect_async()
+        if watch and self._watcher is None:
+            self._watcher = asyncio.create_task(self.watch())
+        return page
+
+    async def _connect_async(self):
+        if self._proxy is not None:
+            page = await self.manager.connect_to_browser_async_with_proxy(
+                self._profile_name, self._proxy, **self._connect_kwargs)
+        else:
+            page = await self.manager.connect_to_browser_async(self._profile_name, **self._connect_kwargs)
+        self._watch()
+        return page
+
+    async def ensure_page_async(self):
+        """
+        Async version of ensure_page. Safe to call from many tasks and the watch() task at once:
+        one crash is recovered once, and the other callers wait for it.
+        """
+        if self.failure is not None:
+            raise self.failure
+        if self.crash_reason() is None:
+            return self.manager.page
+        if self._profile_name is None:
+            raise RuntimeError("BrowserSupervisor.connect_async() has not been called.")
+        if self._recovery_lock is None:
+            self._recovery_lock = asyncio.Lock()
+        async with self._recovery_lock:
+            if self.failure is not None:
+                raise self.failure
+            reason = self.crash_reason()  # another task may have recovered while we waited
+            if reason is None:
+                return self.manager.page
+            self._spend_restart(reason)
+            manager = self.manager
+            with manager._timed("restart", self._profile_name):
+                if reason == "page crashed":
+                    page = await self._replace_page_async()
+                else:
+                    await manager.close_browser_async(force=True)
+                    self._pick_port()
+                    page = await self._connect_async()
+            if self.on_restart:
+                result = self.on_restart(manager, page, reason)
+                if asyncio.iscoroutine(result):
+                    await result
+            return page
+
+    async def _replace_page_async(self):
+        manager = self.manager
+        if manager.page is not None:
+            try:
+                await manager.page.close()
+            except Exception:
+                pass
+        manager.page = await self._context.new_page()
+        self._watch()
+        url = self._connect_kwargs.get("url")
+        if url:
+            await manager._navigate_async(url, self._connect_kwargs.get("timeout", 60000), "load")
+        return manager.page
+
+    async def run_async(self, fn, *args, **kwargs):
+        """Async version of run: await fn(page, *args, **kwargs), recovering and retrying once after a crash."""
+        page = await self.ensure_page_async()
+        try:
+            return await fn(page, *args, **kwargs)
+        except Exception:
+            if self.crash_reason() is None:
+                raise
+        return await fn(await self.ensure_page_async(), *args, **kwargs)
+
+    async def watch(self):
+        """
+        Check the browser every poll_interval seconds and recover it until the budget runs out.
+        Giving up ends the loop quietly; the failure is raised to callers from `failure`.
+        """
+        while not self._closed:
+            await asyncio.sleep(self.poll_interval)
+            if self._closed:
+                return
+            try:
+                await self.ensure_page_async()
+            except RestartBudgetExceeded:
+                return
+            except Exception as e:
+                print(f"Browser recovery failed, retrying: {e}")
+
+    async def close_async(self):
+        """Async version of close; also stops the watch() task."""
+        self._closed = True
+        if self._watcher is not None:
+            self._watcher.cancel()
+            await asyncio.gather(self._watcher, return_exceptions=True)
+            self._watcher = None
+        await self.manager.close_browser_async(force=True)
+        if self.failure is not None:
+            raise self.failure
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close_async()
+        return False
@@ -0,0 +1,196 @@
+import os
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from tab_pool import TabPool
+from result_sinks import ResultSink, sink_for_path
+from crawl_ledger import CrawlLedger
+
+_DONE = object()
+_FLUSH = object()
+
+
+def iter_urls(source):
+    """
+    Yield URLs lazily from a file path (one per line; blank lines and # comments skipped)
+    or pass through any other iterable / async iterable.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        return _read_lines(source)
+    return source
+
+
+def _read_lines(path):
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            url = line.strip()
+            if url and not url.startswith("#"):
+                yield url
+
+
+def _has_rows(path):
+    return os.path.exists(path) and os.path.getsize(path) > 0
+
+
+async def _iterate(source):
+    if hasattr(source, "__aiter__"):
+        async for item in source:
+            yield item
+    else:
+        for item in source:
+            yield item
+
+
+async def _ledger_urls(source, ledger, executor, chunk_size):
+    """
+    URLs to crawl when a ledger is used: new and requeued URLs from source first (done ones are
+    skipped), then retries as their backoff expires, until nothing is pending or in flight.
+    """
+    loop = asyncio.get_running_loop()
+    requeued = await loop.run_in_executor(executor, ledger.recover)
+    if requeued:
+        print(f"Requeued {requeued} URLs that were in flight when the last run stopped")
+    chunk = []
+    async for url in _iterate(source):
+        chunk.append(url)
+        if len(chunk) >= chunk_size:
+            for claimed in await loop.run_in_executor(executor, ledger.claim, chunk):
+                yield claimed
+            chunk = []
+    if chunk:
+        for claimed in await loop.run_in_executor(executor, ledger.claim, chunk):
+            yield claimed
+    while True:
+        due = await loop.run_in_executor(executor, ledger.claim_due, chunk_size)
+        for claimed in due:
+            yield claimed
+        if due:
+            continue
+        if not await loop.run_in_executor(executor, ledger.active):
+            return
+        wait = await loop.run_in_executor(executor, ledger.next_due_in)
+        await asyncio.sleep(min(1.0 if wait is None else max(wait, 0.05), 1.0))
+
+
+async def _write_results(queue, sink, batch_size, flush_interval, executor, stats, failures, ledger=None):
+    """
+    Writer task: batch (url, row) items from queue, hand each batch to the sink on its own thread,
+    then mark the batch's URLs done in the ledger.
+    """
+    loop = asyncio.get_running_loop()
+    batch = []
+
+    async def flush():
+        rows = [row for _, row in batch if row is not None]
+        if rows:
+            await loop.run_in_executor(executor, sink.write_batch, rows)
+            stats["written"] += len(rows)
+        if ledger is not None:
+            await loop.run_in_executor(executor, ledger.mark_done, [url for url, _ in batch])
+        batch.clear()
+
+    try:
+        await loop.run_in_executor(executor, sink.open)
+        while True:
+            try:
+                item = await asyncio.wait_for(queue.get(), timeout=flush_interval if batch else None)
+            except asyncio.TimeoutError:
+                item = _FLUSH
+            if item is _DONE:
+                break
+            if item is not _FLUSH:
+                batch.append(item)
+            if batch and (item is _FLUSH or len(batch) >= batch_size):
+                await flush()
+        if batch:
+            await flush()
+    except Exception as e:
+        failures.append(e)
+        # Keep draining so the crawl never blocks on a full queue; it stops on the recorded failure.
+        while await queue.get() is not _DONE:
+            pass
+    finally:
+        await loop.run_in_executor(executor, sink.close)
+
+
+async def crawl(urls, extractor, sink, manager=None, profile_name=None, pool=None, concurrency=5,
+                batch_size=100, flush_interval=1.0, goto_kwargs=None, on_error=None, progress_every=1000,
+                ledger=None, **connect_kwargs):
+    """
+    Stream URLs through pooled tabs and write the extracted rows through a batched sink.
+    URLs are read lazily and at most `concurrency` pages plus a bounded write queue are in
+    memory at once, so million-line URL files run in flat memory.
+    :param urls: File path (one URL per line), or any iterable / async iterable of URLs.
+    :param extractor: async def extractor(page, url) -> row (dict, list or tuple) or None to skip.
+    :param sink: A result_sinks.ResultSink, or a path ending in .csv, .jsonl or .db. With a ledger,
+                 a path is opened for appending so a resumed crawl keeps the rows of earlier runs.
+    :param manager: BrowserManager to connect to profile_name (extra keyword arguments go to
+                    connect_to_browser_async). Alternatively pass an existing TabPool as pool.
+    :param batch_size: Rows per sink write; a partial batch is written after flush_interval seconds.
+    :param on_error: Called as on_error(url, exception) for URLs that failed for good (default: print).
+    :param ledger: A crawl_ledger.CrawlLedger (or a path for one) that makes the crawl resumable:
+                   URLs already done are skipped, URLs in flight at a crash are requeued, and failed
+                   URLs are retried with backoff. A URL counts as done once its row has been written.
+    :return: {"ok": n, "errors": n, "retries": n, "written": n}
+    """
+    if pool is None and (manager is None or profile_name is None):
+        raise ValueError("crawl() needs manager and profile_name, or an existing TabPool as pool.")
+    if not isinstance(sink, ResultSink):
+        path = os.fspath(sink)
+        append = ledger is not None and os.path.splitext(path)[1].lower() in (".csv", ".jsonl", ".ndjson")
+        sink = sink_for_path(path, append=True) if append else sink_for_path(path)
+    elif ledger is not None and getattr(sink, "append", True) is False and _has_rows(sink.path):
+        raise ValueError(f"{type(sink).__name__}({sink.path!r}) would truncate the rows of earlier runs that "
+                         f"the ledger already counts as done; create it with append=True.")
+    own_ledger = ledger is not None and not isinstance(ledger, CrawlLedger)
+    if own_ledger:
+        ledger = CrawlLedger(os.fspath(ledger))
+    stats = {"ok": 0, "errors": 0, "retries": 0, "written": 0}
+    failures = []
+    queue = asyncio.Queue(maxsize=batch_size * 2)
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="crawl-sink")
+    own_pool = pool is None
+    writer = None
+    try:
+        if own_pool:
+            pool = await TabPool.connect(manager, profile_name, size=concurrency, **connect_kwargs)
+        writer = asyncio.create_task(
+            _write_results(queue, sink, batch_size, flush_interval, executor, stats, failures, ledger))
+        source = iter_urls(urls)
+        if ledger is not None:
+            source = _ledger_urls(source, ledger, executor, batch_size)
+        loop = asyncio.get_running_loop()
+        async for url, result in pool.map(source, extractor, goto_kwargs=goto_kwargs):
+            if failures:
+                raise failures[0]
+            if isinstance(result, Exception):
+                if ledger is not None and await loop.run_in_executor(executor, ledger.mark_failed, url, result):
+                    stats["retries"] += 1
+                    print(f"Error on {url}, will retry: {result}")
+                    continue
+                stats["errors"] += 1
+                if on_error:
+                    on_error(url, result)
+                else:
+                    print(f"Error on {url}: {result}")
+            else:
+                stats["ok"] += 1
+                if result is not None or ledger is not None:
+                    await queue.put((url, result))
+            done = stats["ok"] + stats["errors"]
+            if progress_every and done % progress_every == 0:
+                print(f"Crawled {done} URLs ({stats['errors']} errors, {stats['written']} rows written)")
+        await queue.put(_DONE)
+        await writer
+        if failures:
+            raise failures[0]
+    finally:
+        if writer is not None and not writer.done():
+            writer.cancel()
+            await asyncio.gather(writer, return_exceptions=True)
+        if own_pool and pool is not None:
+            await pool.close()
+        executor.shutdown(wait=own_ledger)
+        if own_ledger:
+            ledger.close()
+    print(f"✅ Crawl finished: {stats['ok']} ok, {stats['errors']} errors, {stats['written']} rows written")
+    return stats
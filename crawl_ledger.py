@@ -0,0 +1,150 @@
+import time
+import sqlite3
+import threading
+
+PENDING, IN_PROGRESS, DONE, FAILED = "pending", "in_progress", "done", "failed"
+
+
+class CrawlLedger:
+    """
+    Persistent per-URL work log for resumable crawls, stored in SQLite.
+    URLs move pending -> in_progress -> done, or back to pending with a backoff delay after a
+    failure, until max_retries is used up and they are marked failed. URLs left in_progress
+    by a crash or Ctrl-C are requeued by recover().
+    """
+
+    def __init__(self, path, max_retries=3, backoff=30.0, backoff_factor=2.0):
+        """
+        :param path: SQLite file for the ledger (created if missing).
+        :param max_retries: Retries after the first failed attempt before a URL is marked failed.
+        :param backoff: Seconds before the first retry; each further retry waits backoff_factor times longer.
+        """
+        self.path = path
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.backoff_factor = backoff_factor
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS urls ("
+                " url TEXT PRIMARY KEY, status TEXT NOT NULL, attempts INTEGER NOT NULL DEFAULT 0,"
+                " next_attempt_at REAL NOT NULL DEFAULT 0, last_error TEXT, updated_at REAL)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS urls_status ON urls (status, next_attempt_at)")
+
+    def recover(self):
+        """Requeue URLs that were in flight when the previous run stopped. Returns how many."""
+        with self._lock, self._conn:
+            cur = self._conn.execute("UPDATE urls SET status = ?, updated_at = ? WHERE status = ?",
+                                     (PENDING, time.time(), IN_PROGRESS))
+            return cur.rowcount
+
+    def claim(self, urls):
+        """
+        Record new URLs and claim the ones that are pending and due.
+        Done, failed, in-flight and backing-off URLs are skipped.
+        :return: The claimed URLs, in input order.
+        """
+        urls = list(dict.fromkeys(urls))
+        if not urls:
+            return []
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR IGNORE INTO urls (url, status, updated_at) VALUES (?, ?, ?)",
+                                   [(url, PENDING, now) for url in urls])
+            claimable = set()
+            for start in range(0, len(urls), 500):
+                chunk = urls[start:start + 500]
+                marks = ",".join("?" for _ in chunk)
+                rows = self._conn.execute(
+                    f"SELECT url FROM urls WHERE url IN ({marks}) AND status = ? AND next_attempt_at <= ?",
+                    chunk + [PENDING, now])
+                claimable.update(row[0] for row in rows)
+            claimed = [url for url in urls if url in claimable]
+            self._conn.executemany("UPDATE urls SET status = ?, updated_at = ? WHERE url = ?",
+                                   [(IN_PROGRESS, now, url) for url in claimed])
+        return claimed
+
+    def claim_due(self, limit=100):
+        """Claim up to limit pending URLs whose backoff has expired (retries and requeued URLs)."""
+        now = time.time()
+        with self._lock, self._conn:
+            urls = [row[0] for row in self._conn.execute(
+                "SELECT url FROM urls WHERE status = ? AND next_attempt_at <= ? ORDER BY next_attempt_at LIMIT ?",
+                (PENDING, now, limit))]
+            self._conn.executemany("UPDATE urls SET status = ?, updated_at = ? WHERE url = ?",
+                                   [(IN_PROGRESS, now, url) for url in urls])
+        return urls
+
+    def next_due_in(self):
+        """Seconds until the next pending URL is due (0 if one is due now), or None if nothing is pending."""
+        with self._lock:
+            row = self._conn.execute("SELECT MIN(next_attempt_at) FROM urls WHERE status = ?", (PENDING,)).fetchone()
+        return None if row[0] is None else max(0.0, row[0] - time.time())
+
+    def mark_done(self, urls):
+        """Mark URLs whose results have been written."""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany("UPDATE urls SET status = ?, last_error = NULL, updated_at = ? WHERE url = ?",
+                                   [(DONE, now, url) for url in urls])
+
+    def mark_failed(self, url, error):
+        """
+        Record a failed attempt: schedule a retry with exponential backoff, or mark the URL failed
+        once max_retries is used up.
+        :return: True if the URL will be retried.
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT attempts FROM urls WHERE url = ?", (url,)).fetchone()
+            attempts = (row[0] if row else 0) + 1
+            retry = attempts <= self.max_retries
+            delay = self.backoff * self.backoff_factor ** (attempts - 1)
+            self._conn.execute(
+                "INSERT INTO urls (url, status, attempts, next_attempt_at, last_error, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT(url) DO UPDATE SET status = excluded.status,"
+                " attempts = excluded.attempts, next_attempt_at = excluded.next_attempt_at,"
+                " last_error = excluded.last_error, updated_at = excluded.updated_at",
+                (url, PENDING if retry else FAILED, attempts, now + delay if retry else 0, str(error)[:500], now))
+        return retry
+
+    def active(self):
+        """True while any URL is pending or in flight."""
+        with self._lock:
+            row = self._conn.execute("SELECT 1 FROM urls WHERE status IN (?, ?) LIMIT 1",
+                                     (PENDING, IN_PROGRESS)).fetchone()
+        return row is not None
+
+    def counts(self):
+        """{status: number of URLs}."""
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM urls GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+    def failed(self):
+        """[(url, attempts, last_error)] for URLs that ran out of retries."""
+        with self._lock:
+            return self._conn.execute("SELECT url, attempts, last_error FROM urls WHERE status = ?",
+                                      (FAILED,)).fetchall()
+
+    def retry_failed(self):
+        """Give every failed URL a fresh set of retries. Returns how many were requeued."""
+        with self._lock, self._conn:
+            cur = self._conn.execute(
+                "UPDATE urls SET status = ?, attempts = 0, next_attempt_at = 0, updated_at = ? WHERE status = ?",
+                (PENDING, time.time(), FAILED))
+            return cur.rowcount
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
@@ -1,5 +1,6 @@
 # example_proxy_uses.py
 from playwright_browser_manager.browser_manager import BrowserManager
+from playwright_browser_manager.proxy_config import ProxyRotator
 
 with BrowserManager(debug_port=9225) as bm:
     page = bm.connect_to_browser_with_proxy(
@@ -16,4 +17,30 @@ with BrowserManager(debug_port=9225) as bm:
     page.wait_for_timeout(5000)
     page.screenshot(path="france_proof.png", full_page=True)
     print("You are in France! Check the screenshot.")
-    input("Press Enter to exit...")
\ No newline at end of file
+    input("Press Enter to exit...")
+
+# Many geo sessions, one browser: each context gets its own proxy, timezone and locale.
+with BrowserManager(debug_port=9226) as bm:
+    for country in ("fr", "de", "gb"):
+        name, page = bm.add_proxy_context(
+            proxy={
+                "server": "http://gw.dataimpulse.com:823",
+                "username": f"xxx5505791abd0cd522901c__cr.{country}",
+                "password": "xxxf5d3919c504d8fc9xxx"
+            },
+            url="https://iphey.com",
+        )
+        print(name, page.title())
+    bm.remove_proxy_context("FR-1")  # drop one session, keep the others running
+    print("Open proxy contexts:", list(bm.proxy_contexts))
+
+# Proxy rotation: each profile sticks to a healthy proxy; banned or slow ones are skipped.
+rotator = ProxyRotator([
+    {"server": "http://gw.dataimpulse.com:823", "username": f"xxx5505791abd0cd522901c__cr.{country}",
+     "password": "xxxf5d3919c504d8fc9xxx"}
+    for country in ("fr", "de", "nl")
+])
+with BrowserManager(debug_port=9227) as bm:
+    page = bm.connect_to_browser_with_proxy(profile_name="france_profile", proxy=rotator, url="https://iphey.com")
+    print(page.title())
+print(rotator.stats())
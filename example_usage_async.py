@@ -1,53 +1,31 @@
 """
 Example multi tab process to collect data fast
 """
-import csv
 import asyncio
 from playwright_browser_manager.browser_manager import BrowserManager
+from playwright_browser_manager.crawl import crawl
+from playwright_browser_manager.result_sinks import CsvSink
 
 csv_path = "data.csv"
-async def scrape_single_link(semaphore, context, link):
-    """Scrape a single link - truly runs in parallel"""
-    async with semaphore:  # Limit to 10 concurrent tabs
-        scraper_page = None
-        scraper_page = await context.new_page()
-        await scraper_page.goto(link, timeout=20000, wait_until="domcontentloaded")
-        # Write to CSV get data and write csv
-        with open(csv_path, "a", newline="", encoding="utf-8") as csv_file:
-            writer = csv.writer(csv_file)
-            writer.writerow(['link', 'size', 'price', 'location', 'phone'])
+async def scrape_single_link(page, link):
+    """Extract data from a link already opened in a pooled tab"""
+    # Get data here, e.g. await page.locator(...).inner_text()
+    return [link, 'size', 'price', 'location', 'phone']
 
 async def main():
     """Main async function"""
-    # Load links
-    with open("links.txt", 'r') as file:
-        all_links = file.readlines()
-        all_links = [x.strip() for x in all_links]
-    # Prepare CSV with header
-    with open(csv_path, "w", newline="", encoding="utf-8") as csv_file:
-        writer = csv.writer(csv_file)
-        writer.writerow(["URL", "Size", "Price", "Location", "Phone"])
     # Setup browser using YOUR BrowserManager (async version)
     debug_port = 9221
     profile_name = "my_facebook_profile"
     manager = BrowserManager(debug_port=debug_port)
-    page = await manager.connect_to_browser_async(profile_name, "https://www.example.com/", headless=False,timeout=60000)
-    context = page.context
-    print(f"Starting to scrape {len(all_links)} links with 10 concurrent tabs...")
-    # Create semaphore to limit to 10 concurrent tabs
-    semaphore = asyncio.Semaphore(10)
-    # Create all tasks
-    tasks = []
-    for link in all_links:
-        task = scrape_single_link(semaphore, context, link)
-        tasks.append(task)
-    # Run all tasks concurrently (semaphore limits to 10 at a time)
-    results = await asyncio.gather(*tasks)
-    completed = len(results)
-    success = sum(1 for _, status in results if status == "Success")
-    errors = sum(1 for _, status in results if status == "Error")
+    # links.txt is read line by line, 10 warm tabs are reused for every link, and rows are
+    # written to the CSV in batches from a background thread instead of reopening it per row.
+    sink = CsvSink(csv_path, header=["URL", "Size", "Price", "Location", "Phone"])
+    stats = await crawl("links.txt", scrape_single_link, sink, manager=manager, profile_name=profile_name,
+                        concurrency=10, goto_kwargs={"timeout": 20000, "wait_until": "domcontentloaded"},
+                        url="https://www.example.com/", headless=False, timeout=60000)
     print(f"\n{'=' * 60}\n✅ Finished!")
-    print(f"Total: {completed} | Success: {success} | Errors: {errors}")
+    print(f"Total: {stats['ok'] + stats['errors']} | Success: {stats['ok']} | Errors: {stats['errors']}")
     print(f"CSV saved as {csv_path}")
     print(f"{'=' * 60}")
     await manager.close_browser_async()
@@ -61,6 +39,8 @@ Async Chrome Manager Use Cases - Multiple Tabs/Pages
 
 import asyncio
 from playwright_browser_manager.browser_manager import BrowserManager
+from playwright_browser_manager.browser_pool import BrowserPool
+from playwright_browser_manager.tab_pool import TabPool
 from playwright.async_api import async_playwright
 
 # ============================================================================
@@ -137,19 +117,13 @@ async def use_case_2_multiple_profiles_multiple_tabs():
     """
     Open multiple browser instances with different profiles, 
     each with multiple tabs. Example: Managing multiple Facebook accounts.
+    BrowserPool leases a free debug port for each browser, so no ports are hardcoded.
     """
     
-    async def manage_profile(profile_name, debug_port, urls):
+    async def manage_profile(pool, profile_name, urls):
         """Manage a single profile with multiple tabs"""
-        manager = BrowserManager(debug_port=debug_port)
-        
-        try:
-            # Connect to browser
-            page = await manager.connect_to_browser_async(
-                profile_name=profile_name,
-                url=urls[0]
-            )
-            
+        async with pool.browser_async(profile_name, url=urls[0]) as manager:
+            page = manager.page
             context = page.context
             pages = [page]  # First page already open
             
@@ -162,27 +136,23 @@ async def use_case_2_multiple_profiles_multiple_tabs():
             # Get titles from all pages
             titles = await asyncio.gather(*[p.title() for p in pages])
             
-            print(f"\n{profile_name} - Tabs opened:")
+            print(f"\n{profile_name} (port {manager.debug_port}) - Tabs opened:")
             for i, title in enumerate(titles):
                 print(f"  Tab {i+1}: {title}")
             
             # Simulate some work
             await asyncio.sleep(2)
             
-            # Close all pages
-            for p in pages:
+            # Close the extra tabs
+            for p in pages[1:]:
                 await p.close()
                 
             return f"{profile_name} completed"
-            
-        finally:
-            await manager.close_browser_async()
     
     # Define profiles and their URLs
     profiles_config = [
         {
             "profile": "my_facebook_profile",
-            "port": 9221,
             "urls": [
                 "https://www.facebook.com",
                 "https://www.facebook.com/marketplace",
@@ -191,7 +161,6 @@ async def use_case_2_multiple_profiles_multiple_tabs():
         },
         {
             "profile": "my_facebook_profile2",
-            "port": 9222,
             "urls": [
                 "https://www.facebook.com",
                 "https://www.facebook.com/watch",
@@ -200,13 +169,13 @@ async def use_case_2_multiple_profiles_multiple_tabs():
         }
     ]
     
-    # Run all profiles in parallel
-    tasks = [
-        manage_profile(config["profile"], config["port"], config["urls"])
-        for config in profiles_config
-    ]
-    
-    results = await asyncio.gather(*tasks)
+    # Run all profiles in parallel, at most 4 browsers at a time
+    async with BrowserPool(max_browsers=4, port_range=(9300, 9400)) as pool:
+        tasks = [
+            manage_profile(pool, config["profile"], config["urls"])
+            for config in profiles_config
+        ]
+        results = await asyncio.gather(*tasks)
     print("\nAll profiles completed:", results)
 
 
@@ -414,6 +383,7 @@ async def use_case_6_tab_pool_management():
     """
     Maintain a pool of tabs and reuse them for different tasks.
     Useful for continuous scraping or monitoring.
+    TabPool keeps the tabs warm and resets each one to about:blank between URLs.
     """
     debug_port = 9221
     profile_name = "my_facebook_profile"
@@ -421,46 +391,54 @@ async def use_case_6_tab_pool_management():
     manager = BrowserManager(debug_port=debug_port)
     
     try:
-        page = await manager.connect_to_browser_async(
+        pool = await TabPool.connect(
+            manager,
             profile_name=profile_name,
+            size=5,
             url="https://www.facebook.com"
         )
         
-        context = page.context
-        
-        # Create a pool of tabs
-        pool_size = 5
-        tab_pool = []
-        for i in range(pool_size):
-            tab = await context.new_page()
-            tab_pool.append(tab)
-            print(f"Created tab {i+1}")
-        
         # Simulate a queue of URLs to process
-        urls_to_process = [
+        urls_to_process = (
             f"https://www.facebook.com/page/{i}" for i in range(15)
-        ]
+        )
         
-        # Process URLs using the tab pool
-        for i, url in enumerate(urls_to_process):
-            tab = tab_pool[i % pool_size]
-            
-            try:
-                await tab.goto(url, timeout=10000)
-                title = await tab.title()
-                print(f"Processed {url} in tab {(i % pool_size) + 1}: {title}")
-                await asyncio.sleep(0.5)
-            except Exception as e:
-                print(f"Error processing {url}: {e}")
+        async def process(tab, url):
+            await asyncio.sleep(0.5)
+            return await tab.title()
+        
+        # At most 5 URLs are in flight; results arrive as each tab finishes
+        async for url, result in pool.map(urls_to_process, process, goto_kwargs={"timeout": 10000}):
+            if isinstance(result, Exception):
+                print(f"Error processing {url}: {result}")
+            else:
+                print(f"Processed {url}: {result}")
         
         # Close all tabs in the pool
-        for tab in tab_pool:
-            await tab.close()
+        await pool.close()
         
     finally:
         await manager.close_browser_async()
 
 
+# ============================================================================
+# USE CASE 7: Bring up many accounts at once
+# ============================================================================
+async def use_case_7_launch_many_profiles():
+    """
+    Start several profiles in parallel and work with each one as soon as it is ready.
+    A profile that fails to start does not stop the others.
+    """
+    profiles = ["my_facebook_profile", "my_facebook_profile2"]
+    
+    async with BrowserPool(max_browsers=10) as pool:
+        async for profile_name, manager, error in pool.launch_many(profiles, url="https://www.facebook.com", headless=True):
+            if error:
+                print(f"{profile_name} failed: {error}")
+                continue
+            print(f"{profile_name} ready on port {manager.debug_port}: {await manager.page.title()}")
+
+
 # ============================================================================
 # Main execution
 # ============================================================================
@@ -505,6 +483,13 @@ async def main():
     print("USE CASE 6: Tab pool management")
     print("=" * 80)
     await use_case_6_tab_pool_management()
+    
+    await asyncio.sleep(2)
+    
+    print("\n" + "=" * 80)
+    print("USE CASE 7: Launch many profiles at once")
+    print("=" * 80)
+    await use_case_7_launch_many_profiles()
 
 
 if __name__ == "__main__":
@@ -72,8 +72,18 @@ with BrowserManager(debug_port=debug_port) as manager:
     page.close()
     manager.close_browser()
 
+# Keep-warm mode: close_browser only closes pages, so the next connect to the same
+# profile reattaches to the running browser instead of relaunching it.
+with BrowserManager(debug_port=debug_port, keep_warm=True, warm_ttl=120) as manager:
+    for url in ["https://www.facebook.com", "https://www.facebook.com/marketplace"]:
+        page = manager.connect_to_browser(profile_name=profile_name, url=url)
+        print("Page Title:", page.title())
+        manager.close_browser()  # browser stays warm for the next iteration
 
-
-
-
-
+# Session export: save the logged-in cookies/localStorage once, then open many isolated
+# account contexts on a single host browser instead of one browser per profile.
+with BrowserManager(debug_port=debug_port) as manager:
+    manager.export_session(profile_name, "facebook_session.json.gz", origins=["https://www.facebook.com"])
+    pages = [manager.connect_with_session("facebook_session.json.gz", url="https://www.facebook.com") for _ in range(3)]
+    for page in pages:
+        print("Page Title:", page.title())
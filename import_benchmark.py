@@ -0,0 +1,74 @@
+import os
+import sys
+import argparse
+import statistics
+import subprocess
+
+# Modules that must stay out of a plain "import <module>"; they are loaded on first use.
+HEAVY_MODULES = ("playwright", "requests")
+
+DEFAULT_MODULES = ("browser_manager", "profile_tools", "proxy_config", "browser_pool")
+
+
+def measure(module, python=sys.executable):
+    """
+    Import module in a fresh interpreter under -X importtime.
+    :return: (cumulative microseconds for module, set of top-level packages that were imported)
+    :raises ValueError: If importtime reports no line for module, e.g. because site already imported it.
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [here, os.environ.get("PYTHONPATH")])))
+    result = subprocess.run([python, "-X", "importtime", "-c", f"import {module}"],
+                            capture_output=True, text=True, env=env, cwd=here)
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr.strip().splitlines()[-1]}")
+    total = None
+    loaded = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue  # header line
+        loaded.add(name.strip().split(".")[0])
+        if name.strip() == module:
+            total = int(cumulative)
+    if total is None:
+        raise ValueError(f"no importtime entry for {module} (already imported at interpreter startup?)")
+    return total, loaded
+
+
+def main(argv=None):
+    """Benchmark module import times and fail if a heavy dependency is imported eagerly or a budget is exceeded."""
+    parser = argparse.ArgumentParser(description="Measure import time with python -X importtime.")
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per module (median is reported).")
+    parser.add_argument("--max-ms", type=float, default=None, help="Fail if a module's median exceeds this.")
+    args = parser.parse_args(argv)
+
+    failed = False
+    for module in args.modules:
+        timings = []
+        eager = set()
+        try:
+            for _ in range(args.runs):
+                total, loaded = measure(module)
+                timings.append(total / 1000)
+                eager |= loaded.intersection(HEAVY_MODULES)
+        except ValueError as e:
+            print(f"{module:<20} skipped: {e}")
+            continue
+        median = statistics.median(timings)
+        status = "ok"
+        if eager:
+            status = f"FAIL: imports {', '.join(sorted(eager))}"
+            failed = True
+        elif args.max_ms is not None and median > args.max_ms:
+            status = f"FAIL: over {args.max_ms:.0f} ms budget"
+            failed = True
+        print(f"{module:<20} {median:8.1f} ms (min {min(timings):.1f})  {status}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
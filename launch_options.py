@@ -0,0 +1,118 @@
+import os
+
+BASE_ARGS = ["--no-first-run", "--no-default-browser-check"]
+
+# Only understood by Brave; added automatically when the executable is Brave.
+BRAVE_ARGS = ["--disable-features=BraveShields", "--brave-ads-service-enabled=0"]
+
+LAUNCH_PRESETS = {
+    "default": [],
+    # Fewer processes and smaller heaps per browser, for packing many sessions onto one node.
+    # Site isolation is switched off so --renderer-process-limit can actually share renderers.
+    "low-memory": [
+        "--renderer-process-limit=2",
+        "--disable-gpu",
+        "--disable-background-networking",
+        "--disable-extensions",
+        "--disable-component-extensions-with-background-pages",
+        "--disable-component-update",
+        "--disable-default-apps",
+        "--disable-sync",
+        "--disable-breakpad",
+        "--mute-audio",
+        "--js-flags=--max-old-space-size=512",
+        "--disable-features=Translate,MediaRouter,OptimizationHints,IsolateOrigins,site-per-process",
+        "--disk-cache-size=33554432",
+    ],
+    # Docker and other containers with a small /dev/shm and no GPU.
+    "container": [
+        "--disable-dev-shm-usage",
+        "--disable-gpu",
+    ],
+}
+
+# Comma-separated lists that are merged instead of replaced (Chromium only honours the last occurrence).
+_LIST_FLAGS = {"--disable-features": ",", "--enable-features": ",", "--js-flags": " "}
+
+# Set by BrowserManager from its own state; overriding them would break the connection or profile handling.
+_RESERVED_FLAGS = {"--remote-debugging-port", "--user-data-dir", "--headless"}
+
+
+def _split(arg):
+    if not isinstance(arg, str) or not arg.startswith("--"):
+        raise ValueError(f"Launch argument {arg!r} must be a string starting with '--'.")
+    name, sep, value = arg.partition("=")
+    return name, (value if sep else None)
+
+
+def _as_list(extra_args):
+    """Accept ["--flag=value", ...] or {"--flag": value}; in a dict, True is a bare switch and None removes the flag."""
+    if not extra_args:
+        return []
+    if isinstance(extra_args, dict):
+        result = []
+        for name, value in extra_args.items():
+            _split(name)
+            result.append((name, None if value is None or value is True else str(value), value is None))
+        return result
+    return [_split(arg) + (False,) for arg in extra_args]
+
+
+def _presets(preset):
+    names = [] if preset is None else [preset] if isinstance(preset, str) else list(preset)
+    for name in names:
+        if name not in LAUNCH_PRESETS:
+            raise ValueError(f"Unknown launch preset {name!r}: choose from {', '.join(LAUNCH_PRESETS)}.")
+    return names
+
+
+def build_launch_args(browser_path, user_data_dir, debug_port=None, headless=False, preset=None,
+                      extra_args=(), url=None):
+    """
+    Command line for launching a browser on a profile.
+    :param preset: Name (or list of names) from LAUNCH_PRESETS, applied in order.
+    :param extra_args: Overrides applied after the presets, in order: lists of "--flag[=value]"
+                       strings, or dicts {"--flag": value} where a None value removes the flag.
+                       Pass several sources as a tuple of lists/dicts. --disable-features,
+                       --enable-features and --js-flags are merged rather than replaced.
+    :param url: Page to open on start.
+    :return: argv list for subprocess.
+    """
+    flags = {}  # name -> value (None for bare switches); insertion order is kept
+
+    def apply(name, value, remove=False):
+        if name in _RESERVED_FLAGS:
+            raise ValueError(f"{name} is set by BrowserManager; use its own parameters instead.")
+        if remove:
+            flags.pop(name, None)
+        elif name in _LIST_FLAGS and flags.get(name) and value:
+            sep = _LIST_FLAGS[name]
+            merged = {item.split("=")[0]: item for item in flags[name].split(sep) if item}
+            merged.update((item.split("=")[0], item) for item in value.split(sep) if item)
+            flags[name] = sep.join(merged.values())
+        else:
+            flags[name] = value
+
+    sources = [[_split(arg) + (False,) for arg in BASE_ARGS]]
+    if "brave" in os.path.basename(browser_path or "").lower():
+        sources.append([_split(arg) + (False,) for arg in BRAVE_ARGS])
+    for name in _presets(preset):
+        sources.append([_split(arg) + (False,) for arg in LAUNCH_PRESETS[name]])
+    if isinstance(extra_args, (list, dict)) or (extra_args and all(isinstance(a, str) for a in extra_args)):
+        extra_args = (extra_args,)
+    for extra in extra_args or ():
+        sources.append(_as_list(extra))
+    for source in sources:
+        for name, value, remove in source:
+            apply(name, value, remove)
+
+    args = [browser_path]
+    if debug_port is not None:
+        args.append(f"--remote-debugging-port={debug_port}")
+    args.append(f"--user-data-dir={user_data_dir}")
+    args += [name if value is None else f"{name}={value}" for name, value in flags.items()]
+    if headless:
+        args.append("--headless=new")
+    if url:
+        args.append(url)
+    return args
@@ -0,0 +1,111 @@
+import threading
+import traceback
+import weakref
+
+LEAK_CHECK_MODES = ("warn", "raise")
+
+_trackers = weakref.WeakSet()
+
+
+class ResourceLeakError(RuntimeError):
+    """Raised by close_browser in leak_check="raise" mode when pages, contexts or drivers were left open."""
+
+
+class LeakTracker:
+    """
+    Remember the Playwright drivers, contexts and pages a BrowserManager opens and report
+    the ones still open when it shuts down.
+    """
+
+    def __init__(self, owner, mode="warn", capture_stacks=True):
+        """
+        :param owner: Label for reports, e.g. the manager's repr.
+        :param mode: "warn" prints leftovers, "raise" raises ResourceLeakError.
+        :param capture_stacks: Record where each resource was opened (shown in reports).
+        """
+        if mode not in LEAK_CHECK_MODES:
+            raise ValueError(f"Unknown leak_check mode {mode!r}: use one of {LEAK_CHECK_MODES}.")
+        self.owner = owner
+        self.mode = mode
+        self.capture_stacks = capture_stacks
+        self._lock = threading.Lock()
+        self._open = {}  # id(obj) -> [kind, obj, opened_at]
+        _trackers.add(self)
+
+    def track(self, kind, obj):
+        """Start tracking obj ("driver", "context" or "page")."""
+        opened_at = "".join(traceback.format_stack(limit=8)[:-2]) if self.capture_stacks else ""
+        with self._lock:
+            if id(obj) in self._open:
+                return
+            self._open[id(obj)] = [kind, obj, opened_at]
+        if kind == "context":
+            obj.on("page", lambda page: self.track("page", page))
+        if kind in ("context", "page"):
+            obj.on("close", lambda *_: self.closed(obj))
+
+    def watch_pages(self, context):
+        """Track pages opened in a context this manager did not create (e.g. the profile's default context)."""
+        context.on("page", lambda page: self.track("page", page))
+
+    def closed(self, obj):
+        """Stop tracking obj; it was closed properly."""
+        with self._lock:
+            entry = self._open.get(id(obj))
+            if entry is not None and entry[1] is obj:
+                del self._open[id(obj)]
+
+    @staticmethod
+    def _is_open(kind, obj):
+        is_closed = getattr(obj, "is_closed", None)
+        if kind != "driver" and callable(is_closed):
+            try:
+                return not is_closed()
+            except Exception:
+                return False
+        return True
+
+    def leftovers(self, kinds=None):
+        """Tracked resources that are still open: [(kind, obj, opened_at)]."""
+        with self._lock:
+            entries = list(self._open.values())
+        return [(kind, obj, opened_at) for kind, obj, opened_at in entries
+                if (kinds is None or kind in kinds) and self._is_open(kind, obj)]
+
+    def counts(self):
+        """{kind: number still open}."""
+        result = {}
+        for kind, _, _ in self.leftovers():
+            result[kind] = result.get(kind, 0) + 1
+        return result
+
+    def collect(self, kinds=None):
+        """Return the leftovers of the given kinds and stop tracking everything of those kinds."""
+        leaks = self.leftovers(kinds)
+        with self._lock:
+            for key in [k for k, entry in self._open.items() if kinds is None or entry[0] in kinds]:
+                del self._open[key]
+        return leaks
+
+    def report(self, leaks):
+        """Print leftovers from collect(), or raise ResourceLeakError in "raise" mode."""
+        if not leaks:
+            return
+        lines = [f"⚠️ {self.owner}: {len(leaks)} resource(s) left open at close:"]
+        for kind, obj, opened_at in leaks:
+            lines.append(f"  - {kind} {obj!r}")
+            if opened_at:
+                lines.append("    opened at:\n" + "".join(f"      {line}\n" for line in opened_at.splitlines()).rstrip())
+        message = "\n".join(lines)
+        if self.mode == "raise":
+            raise ResourceLeakError(message)
+        print(message)
+
+
+def open_resources():
+    """{kind: count} of tracked drivers, contexts and pages still open across every leak-checked manager."""
+    total = {}
+    for tracker in list(_trackers):
+        for kind, count in tracker.counts().items():
+            total[kind] = total.get(kind, 0) + count
+    return total
@@ -0,0 +1,124 @@
+import os
+import bisect
+import logging
+import threading
+from collections import defaultdict
+
+# Lifecycle phases timed by BrowserManager.
+PHASES = ("spawn", "cdp_ready", "connect_over_cdp", "page_acquire", "goto", "load_state", "close", "kill", "restart")
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+class MetricsSink:
+    """Receives one observation per timed phase. Subclass and override observe()."""
+
+    def observe(self, phase, seconds, labels):
+        """
+        :param phase: Phase name (see PHASES).
+        :param seconds: Duration of the phase.
+        :param labels: Dict of labels, e.g. {"profile": "my_profile", "status": "ok"}.
+        """
+        raise NotImplementedError
+
+
+class LoggingSink(MetricsSink):
+    """Log every phase timing through the logging module."""
+
+    def __init__(self, logger=None, level=logging.INFO):
+        self.logger = logger or logging.getLogger("browser_manager.metrics")
+        self.level = level
+
+    def observe(self, phase, seconds, labels):
+        label_text = " ".join(f"{k}={v}" for k, v in sorted(labels.items()))
+        self.logger.log(self.level, "phase=%s seconds=%.3f %s", phase, seconds, label_text)
+
+
+class InMemorySink(MetricsSink):
+    """Keep every observation in a list; intended for tests and ad-hoc analysis."""
+
+    def __init__(self):
+        self.records = []
+        self._lock = threading.Lock()
+
+    def observe(self, phase, seconds, labels):
+        with self._lock:
+            self.records.append((phase, seconds, dict(labels)))
+
+    def timings(self, phase):
+        """All durations recorded for phase."""
+        return [seconds for p, seconds, _ in self.records if p == phase]
+
+    def summary(self):
+        """{phase: {"count", "total", "max"}} over everything recorded."""
+        result = {}
+        for phase, seconds, _ in self.records:
+            entry = result.setdefault(phase, {"count": 0, "total": 0.0, "max": 0.0})
+            entry["count"] += 1
+            entry["total"] += seconds
+            entry["max"] = max(entry["max"], seconds)
+        return result
+
+    def clear(self):
+        with self._lock:
+            self.records.clear()
+
+
+class PrometheusSink(MetricsSink):
+    """Aggregate phase timings into histograms and render them in the Prometheus text format."""
+
+    def __init__(self, name="browser_manager_phase_seconds", buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        # (phase, sorted label items) -> [bucket counts..., sum, count]
+        self._series = defaultdict(lambda: [0] * len(self.buckets) + [0.0, 0])
+
+    def observe(self, phase, seconds, labels):
+        key = (phase, tuple(sorted(labels.items())))
+        with self._lock:
+            series = self._series[key]
+            for i in range(bisect.bisect_left(self.buckets, seconds), len(self.buckets)):
+                series[i] += 1
+            series[-2] += seconds
+            series[-1] += 1
+
+    @staticmethod
+    def _labels(items):
+        def escape(value):
+            return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        return ",".join(f'{k}="{escape(v)}"' for k, v in items)
+
+    def render(self):
+        """Return the histograms in the Prometheus text exposition format."""
+        lines = [
+            f"# HELP {self.name} Duration of BrowserManager lifecycle phases.",
+            f"# TYPE {self.name} histogram",
+        ]
+        with self._lock:
+            for (phase, label_items), series in sorted(self._series.items()):
+                base = (("phase", phase),) + label_items
+                for bound, count in zip(self.buckets, series):
+                    lines.append(f'{self.name}_bucket{{{self._labels(base + (("le", bound),))}}} {count}')
+                lines.append(f'{self.name}_bucket{{{self._labels(base + (("le", "+Inf"),))}}} {series[-1]}')
+                lines.append(f"{self.name}_sum{{{self._labels(base)}}} {series[-2]}")
+                lines.append(f"{self.name}_count{{{self._labels(base)}}} {series[-1]}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """Write render() to a file, e.g. for the node_exporter textfile collector."""
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.render())
+        os.replace(tmp, path)
+
+
+class MultiSink(MetricsSink):
+    """Fan observations out to several sinks."""
+
+    def __init__(self, *sinks):
+        self.sinks = sinks
+
+    def observe(self, phase, seconds, labels):
+        for sink in self.sinks:
+            sink.observe(phase, seconds, labels)
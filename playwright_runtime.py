@@ -0,0 +1,76 @@
+import asyncio
+import threading
+import weakref
+
+# Playwright itself is imported on first acquire so that importing this module stays cheap.
+# The sync driver is bound to the thread that started it and the async driver to its
+# event loop, so "shared" means one reference-counted driver per thread / per loop.
+_sync_lock = threading.Lock()
+_sync_runtimes = {}   # thread id -> [playwright, refcount]
+_async_runtimes = {}  # event loop -> [playwright, refcount]
+_async_locks = weakref.WeakKeyDictionary()  # event loop -> asyncio.Lock
+
+
+def acquire_sync_playwright():
+    """Return the calling thread's shared sync Playwright driver, starting it on first use."""
+    key = threading.get_ident()
+    with _sync_lock:
+        entry = _sync_runtimes.get(key)
+        if entry is None:
+            from playwright.sync_api import sync_playwright
+            entry = _sync_runtimes[key] = [sync_playwright().start(), 0]
+            print("Started shared Playwright driver")
+        entry[1] += 1
+        return entry[0]
+
+
+def release_sync_playwright(playwright):
+    """Drop one reference to a driver from acquire_sync_playwright(); the last release stops it."""
+    key = threading.get_ident()
+    with _sync_lock:
+        entry = _sync_runtimes.get(key)
+        if entry is None or entry[0] is not playwright:
+            raise ValueError("Playwright driver was not acquired from the shared runtime on this thread.")
+        entry[1] -= 1
+        if entry[1] > 0:
+            return
+        del _sync_runtimes[key]
+    playwright.stop()
+    print("Stopped shared Playwright driver")
+
+
+async def acquire_async_playwright():
+    """Return the running loop's shared async Playwright driver, starting it on first use."""
+    loop = asyncio.get_running_loop()
+    lock = _async_locks.setdefault(loop, asyncio.Lock())
+    async with lock:
+        entry = _async_runtimes.get(loop)
+        if entry is None:
+            from playwright.async_api import async_playwright
+            entry = _async_runtimes[loop] = [await async_playwright().start(), 0]
+            print("Started shared Playwright driver")
+        entry[1] += 1
+        return entry[0]
+
+
+async def release_async_playwright(playwright):
+    """Drop one reference to a driver from acquire_async_playwright(); the last release stops it."""
+    loop = asyncio.get_running_loop()
+    async with _async_locks.setdefault(loop, asyncio.Lock()):
+        entry = _async_runtimes.get(loop)
+        if entry is None or entry[0] is not playwright:
+            raise ValueError("Playwright driver was not acquired from the shared runtime on this loop.")
+        entry[1] -= 1
+        if entry[1] > 0:
+            return
+        del _async_runtimes[loop]
+        await playwright.stop()
+    print("Stopped shared Playwright driver")
+
+
+def shared_driver_refcounts():
+    """Return {"sync": n, "async": n} with the number of live references to shared drivers."""
+    return {
+        "sync": sum(entry[1] for entry in _sync_runtimes.values()),
+        "async": sum(entry[1] for entry in _async_runtimes.values()),
+    }
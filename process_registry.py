@@ -0,0 +1,206 @@
+import os
+import json
+import atexit
+import signal
+import threading
+import psutil
+from profile_tools import clone_dir, OWNER_SUFFIX, remove_ephemeral_dir
+
+PID_DIR_NAME = ".pids"
+
+_lock = threading.Lock()
+_live = {}  # browser pid -> pidfile path, for browsers launched by this process
+_reaper_installed = False
+
+
+def pidfile_path(base_profile_dir, profile_name):
+    """Pidfile recording the browser launched for profile_name."""
+    return os.path.join(base_profile_dir, PID_DIR_NAME, f"{profile_name}.pid")
+
+
+def _same_dir(a, b):
+    return os.path.normcase(os.path.abspath(a)) == os.path.normcase(os.path.abspath(b))
+
+
+def _user_data_dir(cmdline):
+    for arg in cmdline or ():
+        if arg.startswith("--user-data-dir="):
+            return arg.split("=", 1)[1].strip('"')
+    return None
+
+
+def _is_alive(pid, create_time):
+    """True if pid is running and is the same process that was recorded (guards against PID reuse)."""
+    try:
+        proc = psutil.Process(pid)
+        return create_time is None or abs(proc.create_time() - create_time) < 1
+    except (psutil.NoSuchProcess, psutil.AccessDenied):
+        return False
+
+
+def kill_process_tree(pid):
+    """Kill pid and all of its descendants, ignoring processes that are already gone or not ours to kill."""
+    try:
+        parent = psutil.Process(pid)
+        procs = parent.children(recursive=True) + [parent]
+    except (psutil.NoSuchProcess, psutil.AccessDenied):
+        return
+    for proc in procs:
+        try:
+            proc.kill()
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            pass
+    psutil.wait_procs(procs, timeout=3)
+
+
+def register_browser(base_profile_dir, profile_name, pid, port=None, user_data_dir=None):
+    """Write a pidfile for a launched browser and make sure the exit reaper is installed."""
+    path = pidfile_path(base_profile_dir, profile_name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    try:
+        create_time = psutil.Process(pid).create_time()
+    except psutil.NoSuchProcess:
+        create_time = None
+    record = {
+        "pid": pid,
+        "create_time": create_time,
+        "port": port,
+        "user_data_dir": os.path.abspath(user_data_dir or os.path.join(base_profile_dir, profile_name)),
+        "owner_pid": os.getpid(),
+        "owner_create_time": psutil.Process().create_time(),
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(record, f)
+    with _lock:
+        _live[pid] = path
+    _install_reaper()
+
+
+def unregister_browser(pid):
+    """Forget a browser that was shut down and remove its pidfile."""
+    with _lock:
+        path = _live.pop(pid, None)
+    if path:
+        record = _read_pidfile(path)
+        if record and record.get("pid") == pid:
+            _remove(path)
+
+
+def _read_pidfile(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def reap_all():
+    """Kill every browser this process launched and has not shut down yet."""
+    with _lock:
+        live = list(_live.items())
+        _live.clear()
+    for pid, path in live:
+        print(f"Reaping browser process tree {pid}")
+        kill_process_tree(pid)
+        _remove(path)
+
+
+def _on_signal(signum, frame, previous):
+    reap_all()
+    if callable(previous):
+        previous(signum, frame)
+    else:
+        signal.signal(signum, signal.SIG_DFL)
+        os.kill(os.getpid(), signum)
+
+
+def _install_reaper():
+    """Reap launched browsers at interpreter exit and on SIGTERM/SIGHUP."""
+    global _reaper_installed
+    with _lock:
+        if _reaper_installed:
+            return
+        _reaper_installed = True
+    atexit.register(reap_all)
+    if threading.current_thread() is not threading.main_thread():
+        return
+    for name in ("SIGTERM", "SIGHUP"):
+        signum = getattr(signal, name, None)
+        if signum is None:
+            continue
+        previous = signal.getsignal(signum)
+        if previous is signal.SIG_IGN:
+            continue
+        signal.signal(signum, lambda s, f, previous=previous: _on_signal(s, f, previous))
+
+
+def profile_in_use(user_data_dir):
+    """True if a running process was started with --user-data-dir=user_data_dir."""
+    for proc in psutil.process_iter(["cmdline"]):
+        try:
+            found = _user_data_dir(proc.info["cmdline"])
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+        if found and _same_dir(found, user_data_dir):
+            return True
+    return False
+
+
+def sweep_orphans(base_profile_dir):
+    """
+    Kill browsers launched through this registry for base_profile_dir whose launching process is gone.
+    Only PIDs recorded in a pidfile are considered, so browsers started by hand on these profiles
+    are never touched; pidfiles of browsers that already exited are removed. Afterwards, throwaway
+    profiles in <base>/.clones whose creating process is gone are deleted.
+    :return: List of killed PIDs.
+    """
+    killed = []
+    pid_dir = os.path.join(base_profile_dir, PID_DIR_NAME)
+    if os.path.isdir(pid_dir):
+        for name in os.listdir(pid_dir):
+            if not name.endswith(".pid"):
+                continue
+            path = os.path.join(pid_dir, name)
+            record = _read_pidfile(path)
+            if not record:
+                _remove(path)
+                continue
+            browser_alive = _is_alive(record["pid"], record.get("create_time"))
+            if browser_alive and _is_alive(record["owner_pid"], record.get("owner_create_time")):
+                continue
+            if browser_alive:
+                print(f"Killing orphaned browser {record['pid']} ({record['user_data_dir']})")
+                kill_process_tree(record["pid"])
+                killed.append(record["pid"])
+            _remove(path)
+    sweep_stale_clones(base_profile_dir)
+    return killed
+
+
+def sweep_stale_clones(base_profile_dir):
+    """Delete throwaway profiles under <base>/.clones whose owner process is gone. Returns their paths."""
+    parent = clone_dir(base_profile_dir)
+    removed = []
+    if not os.path.isdir(parent):
+        return removed
+    for name in os.listdir(parent):
+        if not name.endswith(OWNER_SUFFIX):
+            continue
+        path = os.path.join(parent, name[:-len(OWNER_SUFFIX)])
+        record = _read_pidfile(os.path.join(parent, name))
+        if record and _is_alive(record["owner_pid"], record.get("owner_create_time")):
+            continue
+        if os.path.isdir(path) and profile_in_use(path):
+            continue
+        remove_ephemeral_dir(path)
+        removed.append(path)
+    if removed:
+        print(f"Removed {len(removed)} throwaway profile(s) left by a crashed run")
+    return removed
@@ -0,0 +1,305 @@
+import os
+import sys
+import json
+import errno
+import uuid
+import shutil
+import argparse
+import platform
+import tempfile
+import psutil
+
+SNAPSHOT_DIR_NAME = ".snapshots"
+CLONE_DIR_NAME = ".clones"
+OWNER_SUFFIX = ".owner"  # <clone>.owner records the process that created a throwaway profile
+
+# Runtime lock files; copying them makes Chromium think the profile is already open.
+LOCK_FILES = {"SingletonLock", "SingletonSocket", "SingletonCookie", "lockfile", "RunningChromeVersion"}
+
+# Directories Chromium rebuilds on demand. Skipped when snapshotting.
+REGENERABLE_DIRS = {
+    "Cache", "Code Cache", "GPUCache", "GrShaderCache", "GraphiteDawnCache", "ShaderCache",
+    "DawnCache", "DawnGraphiteCache", "DawnWebGPUCache", "Crashpad", "component_crx_cache",
+    "Media Cache", "optimization_guide_model_store", "BrowserMetrics", "Safe Browsing",
+}
+
+# Regenerable caches nested inside other directories.
+REGENERABLE_SUBDIRS = {os.path.join("Service Worker", "CacheStorage"), os.path.join("Service Worker", "ScriptCache")}
+
+# Browsing history; only removed on request, never cookies, Local Storage or Login Data.
+HISTORY_FILES = {
+    "History", "History-journal", "Visited Links", "Top Sites", "Top Sites-journal",
+    "Shortcuts", "Shortcuts-journal", "Network Action Predictor", "Network Action Predictor-journal",
+}
+
+# Files Chromium replaces rather than rewrites in place, so a clone may share them with the snapshot
+# through a hardlink. Everything else (SQLite databases, LevelDB logs, Preferences) is copied.
+_IMMUTABLE_SUFFIXES = (".ldb", ".sst")
+_IMMUTABLE_DIRS = {"Extensions"}
+
+_FICLONE = 0x40049409  # Linux ioctl: share extents with another file (btrfs, XFS, ...)
+
+
+def _reflink(src, dst):
+    """Copy-on-write clone of a single file. Returns False if the filesystem cannot do it."""
+    if sys.platform.startswith("linux"):
+        import fcntl
+        try:
+            with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+                fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+        except OSError:
+            try:
+                os.remove(dst)
+            except OSError:
+                pass
+            return False
+        shutil.copystat(src, dst)
+        return True
+    if sys.platform == "darwin":
+        import ctypes
+        libc = ctypes.CDLL(None, use_errno=True)
+        return libc.clonefile(os.fsencode(src), os.fsencode(dst), 0) == 0
+    return False
+
+
+def _is_immutable(rel_path):
+    parts = rel_path.split(os.sep)
+    return rel_path.endswith(_IMMUTABLE_SUFFIXES) or any(part in _IMMUTABLE_DIRS for part in parts[:-1])
+
+
+def _walk(src, skip_dirs):
+    """Yield (relative dir, file names) under src, skipping lock files and the named directories."""
+    for root, dirs, files in os.walk(src):
+        dirs[:] = [d for d in dirs if d not in skip_dirs]
+        rel_root = os.path.relpath(root, src)
+        yield ("" if rel_root == "." else rel_root), [f for f in files if f not in LOCK_FILES]
+
+
+def copy_profile_tree(src, dst, skip_dirs=(), cow=False):
+    """
+    Copy a profile directory.
+    :param skip_dirs: Directory names to leave out anywhere in the tree.
+    :param cow: Use reflinks where the filesystem supports them, hardlinks for immutable files, and
+                real copies for everything else. Only safe when src is never written to afterwards.
+    :return: {"reflink": n, "hardlink": n, "copy": n} file counts.
+    """
+    counts = {"reflink": 0, "hardlink": 0, "copy": 0}
+    reflink_ok = cow
+    for rel_root, files in _walk(src, set(skip_dirs)):
+        os.makedirs(os.path.join(dst, rel_root), exist_ok=True)
+        for name in files:
+            rel_path = os.path.join(rel_root, name)
+            s, d = os.path.join(src, rel_path), os.path.join(dst, rel_path)
+            if os.path.islink(s):
+                continue
+            if reflink_ok:
+                if _reflink(s, d):
+                    counts["reflink"] += 1
+                    continue
+                reflink_ok = False  # don't retry on every file of a filesystem without reflinks
+            if cow and _is_immutable(rel_path):
+                try:
+                    os.link(s, d)
+                    counts["hardlink"] += 1
+                    continue
+                except OSError as e:
+                    if e.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOTSUP):
+                        raise
+            shutil.copy2(s, d)
+            counts["copy"] += 1
+    return counts
+
+
+def snapshot_profile(base_profile_dir, profile_name, snapshot_name=None):
+    """
+    Save a read-only copy of a profile (without caches or lock files) under <base>/.snapshots/.
+    The profile's browser should be closed so its databases are consistent.
+    :return: Path to the snapshot.
+    """
+    src = os.path.join(base_profile_dir, profile_name)
+    if not os.path.isdir(src):
+        raise ValueError(f"Profile '{profile_name}' does not exist.")
+    snapshot_name = snapshot_name or profile_name
+    snapshots = os.path.join(base_profile_dir, SNAPSHOT_DIR_NAME)
+    os.makedirs(snapshots, exist_ok=True)
+    dst = os.path.join(snapshots, snapshot_name)
+    staging = tempfile.mkdtemp(prefix=f".{snapshot_name}-", dir=snapshots)
+    copy_profile_tree(src, staging, skip_dirs=REGENERABLE_DIRS)
+    if os.path.exists(dst):
+        old = f"{dst}.old-{os.getpid()}"
+        os.replace(dst, old)
+        os.replace(staging, dst)
+        shutil.rmtree(old, ignore_errors=True)
+    else:
+        os.replace(staging, dst)
+    return dst
+
+
+def snapshot_path(base_profile_dir, snapshot_name):
+    return os.path.join(base_profile_dir, SNAPSHOT_DIR_NAME, snapshot_name)
+
+
+def clone_dir(base_profile_dir):
+    """Directory for throwaway profiles, swept by process_registry.sweep_orphans after a crash."""
+    return os.path.join(base_profile_dir, CLONE_DIR_NAME)
+
+
+def make_ephemeral_dir(parent, name):
+    """Create an empty throwaway profile directory parent/name, with an owner marker next to it."""
+    os.makedirs(parent, exist_ok=True)
+    path = os.path.join(parent, name)
+    os.mkdir(path)
+    with open(path + OWNER_SUFFIX, "w", encoding="utf-8") as f:
+        json.dump({"owner_pid": os.getpid(), "owner_create_time": psutil.Process().create_time()}, f)
+    return path
+
+
+def ephemeral_path(base_profile_dir, name):
+    """Directory of the throwaway profile called name under <base>/.clones, or None if there is none."""
+    path = os.path.join(clone_dir(base_profile_dir), name)
+    return path if os.path.isfile(path + OWNER_SUFFIX) else None
+
+
+def remove_ephemeral_dir(path):
+    """Delete a throwaway profile and its owner marker."""
+    shutil.rmtree(path, ignore_errors=True)
+    try:
+        os.remove(path + OWNER_SUFFIX)
+    except OSError:
+        pass
+
+
+def clone_snapshot(snapshot_dir, clone_parent):
+    """
+    Make a throwaway, writable profile from a snapshot using copy-on-write where possible.
+    :param clone_parent: Directory for the clone, normally clone_dir(base_profile_dir).
+    :return: (clone path, file counts by method). The clone is named <snapshot>-<8 hex digits>.
+    """
+    if not os.path.isdir(snapshot_dir):
+        raise ValueError(f"Snapshot '{snapshot_dir}' does not exist.")
+    name = os.path.basename(os.path.normpath(snapshot_dir))
+    clone = make_ephemeral_dir(clone_parent, f"{name}-{uuid.uuid4().hex[:8]}")
+    try:
+        counts = copy_profile_tree(snapshot_dir, clone, cow=True)
+    except Exception:
+        remove_ephemeral_dir(clone)
+        raise
+    return clone, counts
+
+
+def default_base_profile_dir():
+    """Default base directory for profile folders (C:\\ChromeProfiles, or ~/ChromeProfiles on macOS)."""
+    return "C:\\ChromeProfiles" if platform.system() != "Darwin" else os.path.expanduser("~/ChromeProfiles")
+
+
+def dir_size(path):
+    """Total size in bytes of the files under path (or of path itself if it is a file)."""
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                pass
+    return total
+
+
+def profile_size_report(profile_dir):
+    """
+    Size breakdown of a profile: every top-level entry and every entry of its
+    Default / "Profile N" sub-profiles, largest first.
+    :return: List of (relative path, bytes).
+    """
+    report = []
+    for name in os.listdir(profile_dir):
+        path = os.path.join(profile_dir, name)
+        if os.path.isdir(path) and (name == "Default" or name.startswith("Profile ")):
+            for sub in os.listdir(path):
+                report.append((os.path.join(name, sub), dir_size(os.path.join(path, sub))))
+        else:
+            report.append((name, dir_size(path)))
+    return sorted(report, key=lambda item: item[1], reverse=True)
+
+
+def compact_profile_dir(profile_dir, include_history=False, dry_run=False):
+    """
+    Remove regenerable caches from a profile, keeping cookies, Local Storage, IndexedDB and logins.
+    :param include_history: Also remove browsing history databases.
+    :param dry_run: Only report what would be removed.
+    :return: {"removed": [(relative path, bytes)], "freed": bytes}
+    """
+    removed = []
+    for root, dirs, files in os.walk(profile_dir):
+        rel_root = os.path.relpath(root, profile_dir)
+        for name in list(dirs):
+            rel_path = os.path.normpath(os.path.join(rel_root, name))
+            if name in REGENERABLE_DIRS or any(rel_path.endswith(sub) for sub in REGENERABLE_SUBDIRS):
+                dirs.remove(name)
+                path = os.path.join(root, name)
+                removed.append((rel_path, dir_size(path)))
+                if not dry_run:
+                    shutil.rmtree(path, ignore_errors=True)
+        if include_history:
+            for name in files:
+                if name in HISTORY_FILES:
+                    path = os.path.join(root, name)
+                    removed.append((os.path.normpath(os.path.join(rel_root, name)), dir_size(path)))
+                    if not dry_run:
+                        os.remove(path)
+    return {"removed": removed, "freed": sum(size for _, size in removed)}
+
+
+def _format_size(size):
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.1f} {unit}" if unit != "B" else f"{size} B"
+        size /= 1024
+
+
+def main(argv=None):
+    """Command line: list profiles, show a size breakdown, or trim caches."""
+    parser = argparse.ArgumentParser(description="Inspect and slim Chromium profiles.")
+    parser.add_argument("--base", default=default_base_profile_dir(), help="Base profile directory.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list", help="List profiles and their sizes.")
+    report = commands.add_parser("report", help="Per-directory size breakdown of a profile.")
+    report.add_argument("profile")
+    report.add_argument("--top", type=int, default=20)
+    compact = commands.add_parser("compact", help="Remove regenerable caches from a profile.")
+    compact.add_argument("profile")
+    compact.add_argument("--history", action="store_true", help="Also remove browsing history.")
+    compact.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.command == "list":
+        for name in sorted(os.listdir(args.base)):
+            path = os.path.join(args.base, name)
+            if os.path.isdir(path) and not name.startswith("."):
+                print(f"{_format_size(dir_size(path)):>10}  {name}")
+        return 0
+
+    profile_dir = os.path.join(args.base, args.profile)
+    if not os.path.isdir(profile_dir):
+        print(f"Profile '{args.profile}' does not exist in {args.base}")
+        return 1
+    if args.command == "report":
+        for rel_path, size in profile_size_report(profile_dir)[:args.top]:
+            print(f"{_format_size(size):>10}  {rel_path}")
+        return 0
+
+    from process_registry import profile_in_use
+    if not args.dry_run and profile_in_use(profile_dir):
+        print(f"Profile '{args.profile}' is open in a running browser; close it first.")
+        return 1
+    result = compact_profile_dir(profile_dir, include_history=args.history, dry_run=args.dry_run)
+    for rel_path, size in result["removed"]:
+        print(f"{_format_size(size):>10}  {rel_path}")
+    verb = "Would free" if args.dry_run else "Freed"
+    print(f"{verb} {_format_size(result['freed'])} in profile '{args.profile}'")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
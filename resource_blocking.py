@@ -0,0 +1,109 @@
+from typing import Dict, Any
+
+# Playwright's request.resource_type values.
+RESOURCE_TYPES = {
+    "document", "stylesheet", "image", "media", "font", "script", "texttrack",
+    "xhr", "fetch", "eventsource", "websocket", "manifest", "other",
+}
+
+AD_AND_ANALYTICS_HOSTS = [
+    "doubleclick.net",
+    "googlesyndication.com",
+    "googleadservices.com",
+    "google-analytics.com",
+    "googletagmanager.com",
+    "googletagservices.com",
+    "adservice.google.",
+    "amazon-adsystem.com",
+    "adnxs.com",
+    "criteo.com",
+    "criteo.net",
+    "taboola.com",
+    "outbrain.com",
+    "scorecardresearch.com",
+    "quantserve.com",
+    "hotjar.com",
+    "mixpanel.com",
+    "segment.io",
+    "clarity.ms",
+    "bat.bing.com",
+]
+
+BLOCK_PRESETS: Dict[str, Dict[str, Any]] = {
+    # Only the DOM and scripts are needed to read text.
+    "scrape-text": {
+        "resource_types": {"image", "media", "font", "stylesheet", "texttrack", "manifest"},
+        "url_patterns": AD_AND_ANALYTICS_HOSTS,
+    },
+    # Keep everything that affects rendering, drop video/audio and trackers.
+    "screenshot": {
+        "resource_types": {"media"},
+        "url_patterns": AD_AND_ANALYTICS_HOSTS,
+    },
+    "ads": {
+        "resource_types": set(),
+        "url_patterns": AD_AND_ANALYTICS_HOSTS,
+    },
+}
+
+
+def resolve_block_spec(block_resources):
+    """
+    Normalise a block_resources argument to {"resource_types": set, "url_patterns": tuple}.
+    Accepts a preset name, a dict with resource_types/url_patterns, or a list mixing preset
+    names, resource types and URL substrings (e.g. ["scrape-text", "script", "tracker.example.com"]).
+    """
+    if isinstance(block_resources, (str, dict)):
+        block_resources = [block_resources]
+    resource_types = set()
+    url_patterns = []
+    for item in block_resources:
+        if isinstance(item, dict):
+            unknown = set(item) - {"resource_types", "url_patterns"}
+            if unknown:
+                raise ValueError(f"Unknown block_resources keys: {sorted(unknown)}")
+            bad_types = set(item.get("resource_types", ())) - RESOURCE_TYPES
+            if bad_types:
+                raise ValueError(f"Unknown resource types: {sorted(bad_types)}")
+            resource_types.update(item.get("resource_types", ()))
+            url_patterns.extend(item.get("url_patterns", ()))
+        elif item in BLOCK_PRESETS:
+            resource_types.update(BLOCK_PRESETS[item]["resource_types"])
+            url_patterns.extend(BLOCK_PRESETS[item]["url_patterns"])
+        elif item in RESOURCE_TYPES:
+            resource_types.add(item)
+        elif isinstance(item, str) and ("." in item or "/" in item):
+            url_patterns.append(item)
+        else:
+            raise ValueError(
+                f"Unknown block_resources entry {item!r}: expected a preset {sorted(BLOCK_PRESETS)}, "
+                f"a resource type {sorted(RESOURCE_TYPES)} or a URL pattern."
+            )
+    return {"resource_types": resource_types, "url_patterns": tuple(dict.fromkeys(url_patterns))}
+
+
+def _should_block(spec, request):
+    if request.resource_type in spec["resource_types"]:
+        return True
+    url = request.url
+    return any(pattern in url for pattern in spec["url_patterns"])
+
+
+def make_route_handler(spec):
+    """Build a sync context.route handler that aborts requests matching spec."""
+    def handler(route):
+        if _should_block(spec, route.request):
+            route.abort()
+        else:
+            route.fallback()
+    return handler
+
+
+def make_async_route_handler(spec):
+    """Build an async context.route handler that aborts requests matching spec."""
+    async def handler(route):
+        if _should_block(spec, route.request):
+            await route.abort()
+        else:
+            await route.fallback()
+    return handler
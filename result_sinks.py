@@ -0,0 +1,142 @@
+import os
+import csv
+import json
+import sqlite3
+
+
+class ResultSink:
+    """
+    Destination for crawl results. crawl() calls open(), write_batch() and close() from one
+    background thread, so implementations may use blocking I/O and thread-bound handles.
+    """
+
+    def open(self):
+        pass
+
+    def write_batch(self, rows):
+        """Write a list of rows (dicts, or lists/tuples of values)."""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class CsvSink(ResultSink):
+    """Append rows to a CSV file, keeping it open for the whole crawl."""
+
+    def __init__(self, path, header=None, append=False, encoding="utf-8"):
+        """
+        :param header: Column names. Defaults to the keys of the first dict row; list rows get no header.
+        :param append: Add to an existing file instead of truncating it (no header is written then).
+        """
+        self.path = path
+        self.header = list(header) if header else None
+        self.append = append
+        self.encoding = encoding
+        self._file = None
+        self._writer = None
+        self._header_written = False
+
+    def open(self):
+        exists = self.append and os.path.exists(self.path) and os.path.getsize(self.path) > 0
+        self._file = open(self.path, "a" if self.append else "w", newline="", encoding=self.encoding)
+        self._writer = csv.writer(self._file)
+        self._header_written = exists
+
+    def write_batch(self, rows):
+        if not self._header_written:
+            if self.header is None and isinstance(rows[0], dict):
+                self.header = list(rows[0])
+            if self.header:
+                self._writer.writerow(self.header)
+            self._header_written = True
+        for row in rows:
+            if isinstance(row, dict):
+                row = [row.get(column, "") for column in self.header or row]
+            self._writer.writerow(row)
+        self._file.flush()
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+
+class JsonlSink(ResultSink):
+    """Write one JSON document per line."""
+
+    def __init__(self, path, append=False, encoding="utf-8"):
+        self.path = path
+        self.append = append
+        self.encoding = encoding
+        self._file = None
+
+    def open(self):
+        self._file = open(self.path, "a" if self.append else "w", encoding=self.encoding)
+
+    def write_batch(self, rows):
+        self._file.write("".join(json.dumps(row, ensure_ascii=False, default=str) + "\n" for row in rows))
+        self._file.flush()
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+
+class SqliteSink(ResultSink):
+    """Insert rows into a SQLite table, one transaction per batch."""
+
+    def __init__(self, path, table="results", columns=None):
+        """
+        :param columns: Column names. Defaults to the keys of the first dict row; needed for list rows.
+        """
+        if not table.replace("_", "").isalnum():
+            raise ValueError(f"Invalid table name {table!r}.")
+        self.path = path
+        self.table = table
+        self.columns = list(columns) if columns else None
+        self._conn = None
+        self._ready = False
+
+    def open(self):
+        self._conn = sqlite3.connect(self.path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+
+    def _create_table(self, first_row):
+        if self.columns is None:
+            if not isinstance(first_row, dict):
+                raise ValueError("SqliteSink needs columns=... for list rows.")
+            self.columns = list(first_row)
+        quoted = ", ".join(f'"{c}"' for c in self.columns)
+        self._conn.execute(f'CREATE TABLE IF NOT EXISTS "{self.table}" ({quoted})')
+        placeholders = ", ".join("?" for _ in self.columns)
+        self._insert = f'INSERT INTO "{self.table}" ({quoted}) VALUES ({placeholders})'
+        self._ready = True
+
+    def write_batch(self, rows):
+        if not self._ready:
+            self._create_table(rows[0])
+        values = [
+            [row.get(c) for c in self.columns] if isinstance(row, dict) else list(row)
+            for row in rows
+        ]
+        with self._conn:
+            self._conn.executemany(self._insert, values)
+
+    def close(self):
+        if self._conn:
+            self._conn.close()
+            self._conn = None
+
+
+def sink_for_path(path, **kwargs):
+    """Pick a sink from the file extension: .csv, .jsonl/.ndjson, or .db/.sqlite/.sqlite3."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        return CsvSink(path, **kwargs)
+    if ext in (".jsonl", ".ndjson"):
+        return JsonlSink(path, **kwargs)
+    if ext in (".db", ".sqlite", ".sqlite3"):
+        return SqliteSink(path, **kwargs)
+    raise ValueError(f"Cannot infer a sink for {path!r}: use .csv, .jsonl or .db, or pass a ResultSink.")
@@ -0,0 +1,49 @@
+import os
+import gzip
+import json
+
+
+def save_state(state, path):
+    """
+    Write a Playwright storage state (cookies + localStorage) to path.
+    A path ending in .gz is gzip-compressed; anything else is compact JSON.
+    """
+    data = json.dumps(state, separators=(",", ":")).encode("utf-8")
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp = f"{path}.tmp"
+    if path.endswith(".gz"):
+        with gzip.open(tmp, "wb") as f:
+            f.write(data)
+    else:
+        with open(tmp, "wb") as f:
+            f.write(data)
+    os.replace(tmp, path)
+    return path
+
+
+def load_state(source):
+    """Return a storage state dict from a dict, a .json file or a .json.gz file."""
+    if isinstance(source, dict):
+        return source
+    if not isinstance(source, (str, os.PathLike)):
+        raise TypeError("Session state must be a dict or a path to a .json / .json.gz file.")
+    path = os.fspath(source)
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rb") as f:
+        state = json.loads(f.read().decode("utf-8"))
+    if "cookies" not in state:
+        raise ValueError(f"{path} is not a storage state file (no 'cookies' key).")
+    return state
+
+
+def origins_of(urls):
+    """Unique scheme://host[:port] origins of a list of URLs, in order."""
+    from urllib.parse import urlsplit
+    seen = []
+    for url in urls or ():
+        parts = urlsplit(url)
+        origin = f"{parts.scheme}://{parts.netloc}"
+        if parts.scheme in ("http", "https") and origin not in seen:
+            seen.append(origin)
+    return seen
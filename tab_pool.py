@@ -0,0 +1,194 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+_DONE = object()
+_EMPTY = object()  # put on the idle queue once every slot is lost, to wake waiting acquire() calls
+
+
+class TabPool:
+    def __init__(self, context, size=5, reset_url="about:blank"):
+        """
+        Keep `size` pages of a browser context warm and recycle them between tasks.
+        :param context: Async Playwright BrowserContext to open pages in.
+        :param size: Number of pages in the pool (also the concurrency of map()).
+        :param reset_url: URL a page is reset to before it is reused (default: about:blank).
+        """
+        if size < 1:
+            raise ValueError("size must be at least 1.")
+        self.context = context
+        self.size = size
+        self._capacity = size
+        self.reset_url = reset_url
+        self._idle = asyncio.Queue()
+        self._pages = []
+        self._started = False
+        self._broken = None
+
+    @classmethod
+    async def connect(cls, manager, profile_name, size=5, reset_url="about:blank", **connect_kwargs):
+        """Connect manager to profile_name with connect_to_browser_async and build a started pool on its context."""
+        page = await manager.connect_to_browser_async(profile_name, **connect_kwargs)
+        pool = cls(page.context, size=size, reset_url=reset_url)
+        await pool.start()
+        return pool
+
+    async def start(self):
+        """Open the pool's pages."""
+        if self._started:
+            return self
+        for _ in range(self.size):
+            page = await self.context.new_page()
+            self._pages.append(page)
+            self._idle.put_nowait(page)
+        self._started = True
+        print(f"Tab pool ready with {self.size} tabs")
+        return self
+
+    async def _replace(self, page):
+        """Swap a dead or unusable page for a new one."""
+        if page in self._pages:
+            self._pages.remove(page)
+        try:
+            if not page.is_closed():
+                await page.close()
+        except Exception:
+            pass
+        new_page = await self.context.new_page()
+        self._pages.append(new_page)
+        return new_page
+
+    def _lose_slot(self, error):
+        """A page could not be replaced: shrink the pool, and fail waiting acquire() calls once it is empty."""
+        self.size -= 1
+        print(f"Could not replace tab, pool shrinks to {self.size}: {error}")
+        if self.size <= 0 and self._broken is None:
+            self._broken = RuntimeError(f"Tab pool has no usable tabs left: {error}")
+            self._idle.put_nowait(_EMPTY)
+
+    async def acquire(self):
+        """Wait for an idle page and return it. Raises RuntimeError once no tab can be opened any more."""
+        if not self._started:
+            await self.start()
+        if self._broken is not None:
+            raise self._broken
+        page = await self._idle.get()
+        if page is _EMPTY:
+            self._idle.put_nowait(_EMPTY)  # wake the next waiter too
+            raise self._broken
+        if page.is_closed():
+            try:
+                page = await self._replace(page)
+            except Exception as e:
+                self._lose_slot(e)
+                raise
+        return page
+
+    async def release(self, page):
+        """Reset a page to reset_url and return it to the pool (or give up its slot if it cannot be replaced)."""
+        try:
+            if page.is_closed():
+                page = await self._replace(page)
+            else:
+                await page.goto(self.reset_url)
+        except Exception as e:
+            print(f"Error resetting tab, replacing it: {e}")
+            try:
+                page = await self._replace(page)
+            except Exception as e:
+                page = None
+                self._lose_slot(e)
+        finally:
+            if page is not None:
+                self._idle.put_nowait(page)
+
+    @asynccontextmanager
+    async def tab(self):
+        """Context manager around acquire()/release()."""
+        page = await self.acquire()
+        try:
+            yield page
+        finally:
+            await self.release(page)
+
+    async def map(self, urls, handler, goto_kwargs=None, return_exceptions=True):
+        """
+        Open each URL in a pooled tab and run `await handler(page, url)` on it.
+        Yields (url, result) pairs in completion order; at most `size` URLs are in flight and
+        `urls` (a sync or async iterable) is consumed lazily, so a slow consumer slows the producer.
+        :param goto_kwargs: Keyword arguments for page.goto (default: wait_until="domcontentloaded").
+        :param return_exceptions: Yield the exception as the result instead of raising it.
+        """
+        goto_kwargs = goto_kwargs or {"wait_until": "domcontentloaded"}
+        workers = self.size  # fixed for this call even if the pool loses tabs while it runs
+        todo = asyncio.Queue(maxsize=workers)
+        results = asyncio.Queue(maxsize=workers)
+        errors = []
+
+        async def produce():
+            try:
+                if hasattr(urls, "__aiter__"):
+                    async for url in urls:
+                        await todo.put(url)
+                else:
+                    for url in urls:
+                        await todo.put(url)
+            except Exception as e:
+                errors.append(e)
+            for _ in range(workers):
+                await todo.put(_DONE)
+
+        async def work():
+            while True:
+                url = await todo.get()
+                if url is _DONE:
+                    await results.put(_DONE)
+                    return
+                try:
+                    async with self.tab() as page:
+                        await page.goto(url, **goto_kwargs)
+                        result = await handler(page, url)
+                except Exception as e:
+                    result = e
+                await results.put((url, result))
+
+        tasks = [asyncio.create_task(produce())]
+        tasks += [asyncio.create_task(work()) for _ in range(workers)]
+        try:
+            finished = 0
+            while finished < workers:
+                item = await results.get()
+                if item is _DONE:
+                    finished += 1
+                    continue
+                url, result = item
+                if isinstance(result, Exception) and not return_exceptions:
+                    raise result
+                yield url, result
+            if errors:
+                raise errors[0]
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def close(self):
+        """Close every page in the pool."""
+        for page in self._pages:
+            try:
+                if not page.is_closed():
+                    await page.close()
+            except Exception as e:
+                print(f"Error closing tab: {e}")
+        self._pages = []
+        self._idle = asyncio.Queue()
+        self._started = False
+        self._broken = None
+        self.size = self._capacity
+        print("Tab pool closed")
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+        return False
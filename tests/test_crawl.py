@@ -0,0 +1,71 @@
+import csv
+import asyncio
+import pytest
+from crawl import crawl
+from crawl_ledger import CrawlLedger
+from result_sinks import CsvSink
+
+
+class FakePool:
+    """Stands in for TabPool: runs the handler on each URL without a browser."""
+
+    async def map(self, urls, handler, goto_kwargs=None, return_exceptions=True):
+        async for url in urls:
+            try:
+                yield url, await handler(None, url)
+            except Exception as e:
+                yield url, e
+
+
+def _urls(n):
+    return [f"https://example.com/{i}" for i in range(n)]
+
+
+def _run(urls, extractor, sink, ledger):
+    return asyncio.run(crawl(urls, extractor, sink, pool=FakePool(), ledger=ledger,
+                             batch_size=4, flush_interval=0.05, progress_every=0))
+
+
+def _rows(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+async def _extract(page, url):
+    return {"url": url}
+
+
+def test_resumed_crawl_keeps_rows_of_earlier_runs(tmp_path):
+    out, ledger = str(tmp_path / "out.csv"), str(tmp_path / "ledger.db")
+    _run(_urls(11), _extract, out, ledger)
+    assert len(_rows(out)) == 11
+
+    stats = _run(_urls(20), _extract, out, ledger)
+    assert stats["ok"] == 9
+    assert sorted(row["url"] for row in _rows(out)) == sorted(_urls(20))
+
+
+def test_resume_refuses_a_truncating_sink(tmp_path):
+    out, ledger = str(tmp_path / "out.csv"), str(tmp_path / "ledger.db")
+    _run(_urls(3), _extract, out, ledger)
+    with pytest.raises(ValueError, match="append=True"):
+        _run(_urls(5), _extract, CsvSink(out), ledger)
+    assert len(_rows(out)) == 3
+
+
+def test_failed_url_is_retried_and_written_once(tmp_path):
+    out, ledger = str(tmp_path / "out.jsonl"), str(tmp_path / "ledger.db")
+    attempts = {}
+
+    async def flaky(page, url):
+        attempts[url] = attempts.get(url, 0) + 1
+        if url.endswith("/1") and attempts[url] == 1:
+            raise RuntimeError("boom")
+        return {"url": url}
+
+    with CrawlLedger(ledger, backoff=0.01) as led:
+        stats = _run(_urls(3), flaky, out, led)
+        assert stats == {"ok": 3, "errors": 0, "retries": 1, "written": 3}
+        assert led.counts() == {"done": 3}
+    with open(out, encoding="utf-8") as f:
+        assert len(f.readlines()) == 3
@@ -0,0 +1,75 @@
+import time
+import pytest
+from crawl_ledger import CrawlLedger
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    with CrawlLedger(str(tmp_path / "ledger.db"), max_retries=2, backoff=10.0, backoff_factor=3.0) as led:
+        yield led
+
+
+def _next_attempt_at(ledger, url):
+    return ledger._conn.execute("SELECT next_attempt_at FROM urls WHERE url = ?", (url,)).fetchone()[0]
+
+
+def test_claim_skips_done_and_in_flight_urls(ledger):
+    assert ledger.claim(["a", "b", "a"]) == ["a", "b"]
+    assert ledger.claim(["a", "b", "c"]) == ["c"]
+    ledger.mark_done(["a"])
+    assert ledger.claim(["a"]) == []
+    assert ledger.counts() == {"done": 1, "in_progress": 2}
+
+
+def test_recover_requeues_in_flight_urls(ledger):
+    ledger.claim(["a", "b"])
+    ledger.mark_done(["a"])
+    assert ledger.recover() == 1
+    assert ledger.claim_due() == ["b"]
+    assert ledger.recover() == 1
+    assert ledger.recover() == 0
+
+
+def test_mark_failed_backs_off_exponentially_then_gives_up(ledger):
+    ledger.claim(["a"])
+    before = time.time()
+    assert ledger.mark_failed("a", RuntimeError("first")) is True
+    assert _next_attempt_at(ledger, "a") == pytest.approx(before + 10.0, abs=1.0)
+    assert ledger.claim_due() == []
+    assert ledger.next_due_in() == pytest.approx(10.0, abs=1.0)
+
+    assert ledger.mark_failed("a", RuntimeError("second")) is True
+    assert _next_attempt_at(ledger, "a") == pytest.approx(time.time() + 30.0, abs=1.0)
+
+    assert ledger.mark_failed("a", RuntimeError("third")) is False
+    assert ledger.failed() == [("a", 3, "third")]
+    assert not ledger.active()
+
+
+def test_claim_due_returns_urls_once_backoff_expires(tmp_path):
+    with CrawlLedger(str(tmp_path / "ledger.db"), backoff=0.05) as ledger:
+        ledger.claim(["a", "b"])
+        ledger.mark_failed("a", RuntimeError("boom"))
+        assert ledger.claim_due() == []
+        time.sleep(0.1)
+        assert ledger.claim_due() == ["a"]
+        assert ledger.claim_due() == []
+
+
+def test_retry_failed_resets_attempts(ledger):
+    ledger.claim(["a"])
+    for _ in range(3):
+        ledger.mark_failed("a", RuntimeError("boom"))
+    assert ledger.retry_failed() == 1
+    assert ledger.claim_due() == ["a"]
+    assert ledger.mark_failed("a", RuntimeError("again")) is True
+
+
+def test_state_survives_reopening(tmp_path):
+    path = str(tmp_path / "ledger.db")
+    with CrawlLedger(path) as ledger:
+        ledger.claim(["a", "b"])
+        ledger.mark_done(["a"])
+    with CrawlLedger(path) as ledger:
+        assert ledger.recover() == 1
+        assert ledger.claim(["a", "b"]) == ["b"]